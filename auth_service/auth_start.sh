@@ -2,4 +2,10 @@
 
 alembic upgrade head
 
+# Samples of the previous run must not be aggregated with the new workers.
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
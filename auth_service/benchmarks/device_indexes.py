@@ -0,0 +1,187 @@
+"""
+Benchmark of device and user lookups with the old and the new indexes.
+
+Seeds users and devices into a separate database of a local Postgres, then runs
+the queries of UserRepository and DeviceRepository with the single column indexes
+(before revision 75493268f576) and with the composite, covering and lower(email)
+indexes. Prints EXPLAIN (ANALYZE, BUFFERS) of every query and its latency.
+
+Run from the auth_service directory, it uses the DB_*_TEST settings:
+    python -m benchmarks.device_indexes [--users 200000] [--devices 2000000]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import asyncpg
+
+from src.config import settings
+
+DB = settings.DB
+
+SCHEMA = """
+CREATE TABLE "user" (
+    id uuid PRIMARY KEY,
+    email varchar NOT NULL,
+    password varchar NOT NULL,
+    is_active boolean NOT NULL,
+    is_superuser boolean NOT NULL,
+    is_staff boolean NOT NULL
+);
+CREATE TABLE device (
+    id uuid PRIMARY KEY,
+    user_id uuid NOT NULL REFERENCES "user" (id),
+    user_agent varchar(255) NOT NULL,
+    ip varchar(45) NOT NULL,
+    location varchar(255),
+    jti uuid NOT NULL,
+    expires_at timestamptz NOT NULL
+);
+CREATE INDEX ix_device_expires_at ON device (expires_at);
+"""
+
+SEED_USERS = """
+INSERT INTO "user"
+SELECT gen_random_uuid(), 'User' || i || '@example.com', 'hash', true, false, false
+FROM generate_series(1, $1) AS i
+"""
+
+# Every user gets devices / users devices.
+SEED_DEVICES = """
+INSERT INTO device
+SELECT gen_random_uuid(), u.id, 'Chrome 129 on Linux', '10.0.0.1', 'Europe',
+       gen_random_uuid(), now() + interval '30 days'
+FROM (SELECT id, row_number() OVER () AS n FROM "user") AS u
+JOIN generate_series(1, $2) AS i ON i % $1 = u.n - 1
+"""
+
+OLD_INDEXES = """
+CREATE INDEX ix_device_user_id ON device (user_id);
+CREATE INDEX ix_device_jti ON device (jti);
+ALTER TABLE "user" ADD CONSTRAINT user_email_key UNIQUE (email);
+"""
+
+NEW_INDEXES = """
+DROP INDEX ix_device_user_id;
+DROP INDEX ix_device_jti;
+ALTER TABLE "user" DROP CONSTRAINT user_email_key;
+CREATE UNIQUE INDEX ix_device_user_id_jti ON device (user_id, jti);
+CREATE INDEX ix_device_user_id_list ON device (user_id)
+    INCLUDE (id, user_agent, ip, location);
+CREATE UNIQUE INDEX ix_user_email_lower ON "user" (lower(email));
+"""
+
+# Queries of the repositories, arguments are taken from a random device.
+QUERIES = {
+    "device by (user_id, jti)": (
+        "SELECT * FROM device WHERE user_id = $1 AND jti = $2",
+        lambda sample: (sample["user_id"], sample["jti"]),
+    ),
+    "device list of user": (
+        "SELECT id, user_agent, ip, location FROM device WHERE user_id = $1",
+        lambda sample: (sample["user_id"],),
+    ),
+    # Not indexed after the change, UserRepository compares lower(email).
+    "user by email": (
+        'SELECT * FROM "user" WHERE email = $1',
+        lambda sample: (sample["email"],),
+    ),
+    "user by lower(email)": (
+        'SELECT * FROM "user" WHERE lower(email) = lower($1)',
+        lambda sample: (sample["email"].lower(),),
+    ),
+}
+
+
+async def prepare_database(name: str, users: int, devices: int) -> None:
+    server = await connect("postgres")
+    try:
+        await server.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        await server.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await server.close()
+
+    conn = await connect(name)
+    try:
+        started_at = time.perf_counter()
+        await conn.execute(SCHEMA)
+        await conn.execute(SEED_USERS, users)
+        await conn.execute(SEED_DEVICES, users, devices)
+        print(
+            f"Seeded {users} users and {devices} devices "
+            f"in {time.perf_counter() - started_at:.1f} s"
+        )
+    finally:
+        await conn.close()
+
+
+async def connect(name: str) -> asyncpg.Connection:
+    return await asyncpg.connect(
+        user=DB.USERNAME_TEST,
+        password=DB.PASSWORD_TEST,
+        host=DB.HOST_TEST,
+        port=DB.PORT_TEST,
+        database=name,
+    )
+
+
+async def measure(conn: asyncpg.Connection, samples: list, number: int) -> None:
+    for title, (query, arguments) in QUERIES.items():
+        plan: list = await conn.fetch(
+            f"EXPLAIN (ANALYZE, BUFFERS) {query}", *arguments(samples[0])
+        )
+        statement = await conn.prepare(query)
+        durations: list[float] = []
+        for sample in random.choices(samples, k=number):
+            started_at = time.perf_counter()
+            await statement.fetch(*arguments(sample))
+            durations.append((time.perf_counter() - started_at) * 1000)
+        durations.sort()
+        print(
+            f"\n{title}: p50 {statistics.median(durations):.3f} ms, "
+            f"p99 {durations[int(len(durations) * 0.99)]:.3f} ms"
+        )
+        print("\n".join(f"    {row[0]}" for row in plan))
+
+
+async def run(args: argparse.Namespace) -> None:
+    await prepare_database(args.database, args.users, args.devices)
+    conn = await connect(args.database)
+    try:
+        samples = await conn.fetch(
+            'SELECT d.user_id, d.jti, u.email FROM device AS d JOIN "user" AS u '
+            "ON u.id = d.user_id ORDER BY random() LIMIT 1000"
+        )
+        for title, indexes in (("Before", OLD_INDEXES), ("After", NEW_INDEXES)):
+            started_at = time.perf_counter()
+            await conn.execute(indexes)
+            # Visibility map is needed by index only scans.
+            await conn.execute("VACUUM ANALYZE")
+            print(
+                f"\n===== {title}, indexes built "
+                f"in {time.perf_counter() - started_at:.1f} s ====="
+            )
+            await measure(conn, samples, args.number)
+    finally:
+        await conn.close()
+        if not args.keep:
+            server = await connect("postgres")
+            await server.execute(f'DROP DATABASE IF EXISTS "{args.database}"')
+            await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--devices", type=int, default=2_000_000)
+    parser.add_argument("--number", type=int, default=2000, help="Runs of a query")
+    parser.add_argument("--database", default="benchmark_device_indexes")
+    parser.add_argument("--keep", action="store_true", help="Keep the database")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microbenchmark of JWT encode/decode for the algorithms supported by JWTKeyManager.
+
+Run from the auth_service directory:
+    python -m benchmarks.jwt_algorithms [--number 2000]
+
+Keys for other algorithms can be generated with openssl:
+    ES256: openssl genpkey -algorithm EC -pkeyopt ec_paramgen_curve:P-256 -out private.pem
+    EdDSA: openssl genpkey -algorithm ed25519 -out private.pem
+    public key: openssl pkey -in private.pem -pubout -out public.pem
+"""
+
+import argparse
+import time
+import uuid
+from typing import Callable
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+PAYLOAD = {"sub": str(uuid.uuid4()), "type": "access", "exp": 2**31 - 1}
+
+
+def generate_keys(algorithm: str) -> tuple[str, str]:
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private_pem, public_pem
+
+
+def measure(func: Callable[[], object], number: int) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10}{'keys':<8}{'encode, us':>12}{'decode, us':>12}")
+    for algorithm in ("RS256", "ES256", "EdDSA"):
+        private_pem, public_pem = generate_keys(algorithm)
+        private_key = serialization.load_pem_private_key(
+            private_pem.encode(), password=None
+        )
+        public_key = serialization.load_pem_public_key(public_pem.encode())
+
+        for label, signing_key, verifying_key in (
+            ("pem", private_pem, public_pem),
+            ("parsed", private_key, public_key),
+        ):
+            token = jwt.encode(PAYLOAD, signing_key, algorithm=algorithm)
+            encode_time = measure(
+                lambda: jwt.encode(PAYLOAD, signing_key, algorithm=algorithm),
+                args.number,
+            )
+            decode_time = measure(
+                lambda: jwt.decode(token, verifying_key, algorithms=[algorithm]),
+                args.number,
+            )
+            print(f"{algorithm:<10}{label:<8}{encode_time:>12.1f}{decode_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
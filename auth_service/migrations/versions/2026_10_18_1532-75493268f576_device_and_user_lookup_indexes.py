@@ -0,0 +1,60 @@
+"""device and user lookup indexes
+
+Revision ID: 75493268f576
+Revises: 605f446cac97
+Create Date: 2026-10-18 15:32:11.778831
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "75493268f576"
+down_revision: Union[str, None] = "605f446cac97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Indexes are built CONCURRENTLY, so writes to large tables aren't blocked.
+    # New indexes are created before the replaced ones are dropped.
+    # Fails if emails differ only by case, such users must be merged first.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_device_user_id_jti",
+            "device",
+            ["user_id", "jti"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_device_user_id_list",
+            "device",
+            ["user_id"],
+            unique=False,
+            postgresql_include=["id", "user_agent", "ip", "location"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_email_lower",
+            "user",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_device_jti", table_name="device")
+    op.drop_index("ix_device_user_id", table_name="device")
+    op.drop_constraint("user_email_key", "user", type_="unique")
+
+
+def downgrade() -> None:
+    op.create_unique_constraint("user_email_key", "user", ["email"])
+    op.create_index("ix_device_user_id", "device", ["user_id"], unique=False)
+    op.create_index("ix_device_jti", "device", ["jti"], unique=False)
+    op.drop_index("ix_user_email_lower", table_name="user")
+    op.drop_index("ix_device_user_id_list", table_name="device")
+    op.drop_index("ix_device_user_id_jti", table_name="device")
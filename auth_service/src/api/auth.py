@@ -6,24 +6,32 @@ from fastapi import APIRouter, Depends, Body, Request
 from pydantic import EmailStr
 from starlette.responses import JSONResponse
 
-from src.core.database.models.user import User
 from src.core.schemas.device import SDeviceGet
 from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import UserDTO
+from src.core.schemas.ws_ticket import SWSTicket
 from src.dependencies import (
+    get_access_token_payload,
     get_current_user_for_refresh,
     get_authorization_service,
     get_token_service,
     get_current_active_user,
+    get_current_active_principal,
     get_user_agent,
+    rate_limit,
 )
 from src.services.auth_service import AuthService
 from src.services.token_service import TokenService
+from src.services.ws_ticket_service import ws_ticket_service
+from src.utils.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=ProfiledRoute)
 logger = logging.getLogger(__name__)
 
 
-@router.post("/login/", response_model=SToken)
+@router.post(
+    "/login/", response_model=SToken, dependencies=[Depends(rate_limit("LOGIN"))]
+)
 async def login_user(
     request: Request,
     email: Annotated[EmailStr, Body()],
@@ -37,10 +45,11 @@ async def login_user(
 @router.post("/logout/")
 async def logout(
     refresh_token: Annotated[str, Body()],
-    user: Annotated[User, Depends(get_current_active_user)],
+    user: Annotated[UserDTO, Depends(get_current_active_user)],
+    access_token_payload: Annotated[dict, Depends(get_access_token_payload)],
     auth_service: Annotated[AuthService, Depends(get_authorization_service)],
 ):
-    await auth_service.logout(refresh_token)
+    await auth_service.logout(refresh_token, access_token_payload)
     return JSONResponse({"message": "Successfully logged out"})
 
 
@@ -51,11 +60,16 @@ async def refresh_jwt_token(
     auth_service: Annotated[AuthService, Depends(get_authorization_service)],
     token_service: Annotated[TokenService, Depends(get_token_service)],
 ) -> SToken:
-    user: User = await get_current_user_for_refresh(refresh_token, token_service)
+    user: UserDTO = await get_current_user_for_refresh(refresh_token, token_service)
     return await auth_service.refresh_jwt_token(refresh_token, user, user_agent)
 
 
-@router.post("/register/", response_model=SToken, status_code=201)
+@router.post(
+    "/register/",
+    response_model=SToken,
+    status_code=201,
+    dependencies=[Depends(rate_limit("REGISTER"))],
+)
 async def registration(
     request: Request,
     email: Annotated[EmailStr, Body()],
@@ -72,7 +86,7 @@ async def registration(
 
 @router.get("/devices/", response_model=list[SDeviceGet])
 async def get_my_devices(
-    user: Annotated[User, Depends(get_current_active_user)],
+    user: Annotated[UserDTO, Depends(get_current_active_principal)],
     auth_service: Annotated[AuthService, Depends(get_authorization_service)],
 ) -> list[SDeviceGet]:
     return await auth_service.get_my_devices(user)
@@ -81,7 +95,7 @@ async def get_my_devices(
 @router.post("/devices/logout/")
 async def logout_device(
     device_id: Annotated[uuid.UUID, Body()],
-    user: Annotated[User, Depends(get_current_active_user)],
+    user: Annotated[UserDTO, Depends(get_current_active_user)],
     auth_service: Annotated[AuthService, Depends(get_authorization_service)],
 ):
     await auth_service.logout_device(device_id, user)
@@ -89,7 +103,16 @@ async def logout_device(
 
 @router.post("/devices/logout-all/")
 async def logout_all_devices(
-    user: Annotated[User, Depends(get_current_active_user)],
+    user: Annotated[UserDTO, Depends(get_current_active_user)],
     auth_service: Annotated[AuthService, Depends(get_authorization_service)],
 ):
     await auth_service.logout_all_devices(user)
+
+
+@router.post("/ws-ticket/", response_model=SWSTicket)
+async def issue_ws_ticket(
+    user: Annotated[UserDTO, Depends(get_current_active_user)],
+    access_token_payload: Annotated[dict, Depends(get_access_token_payload)],
+) -> SWSTicket:
+    """One-time ticket which authenticates a WebSocket connection of the device."""
+    return await ws_ticket_service.issue(user.id, access_token_payload.get("sid"))
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database.database import (
+    engine,
+    get_async_session,
+    pool_stats,
+    slow_query_log,
+)
+from src.core.schemas.database import SPoolStats, SSlowQuery
+from src.core.schemas.token import SIntrospectRequest, STokenIntrospection
+from src.core.schemas.ws_ticket import SWSTicketOwner, SWSTicketRedeem
+from src.dependencies import verify_internal_api_key
+from src.services.introspection_service import IntrospectionService
+from src.services.ws_ticket_service import ws_ticket_service
+from src.utils.profiling import ProfiledRoute
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(verify_internal_api_key)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.get("/db/pool", response_model=SPoolStats)
+async def get_db_pool_stats() -> SPoolStats:
+    pool = engine.pool
+    return SPoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        connects=pool_stats.connects,
+        checkouts=pool_stats.checkouts,
+        checkins=pool_stats.checkins,
+        invalidations=pool_stats.invalidations,
+    )
+
+
+@router.get("/db/slow-queries", response_model=list[SSlowQuery])
+async def get_slow_queries() -> list[SSlowQuery]:
+    """Slow statements of this worker by fingerprint, the longest in total first."""
+    return [
+        SSlowQuery(
+            fingerprint=query.fingerprint,
+            statement=query.statement,
+            parameters=query.parameters,
+            calls=query.calls,
+            total_ms=round(query.total_time * 1000, 2),
+            max_ms=round(query.max_time * 1000, 2),
+            callers=sorted(query.callers),
+            plan=query.plan,
+        )
+        for query in slow_query_log.report()
+    ]
+
+
+@router.post("/introspect", response_model=list[STokenIntrospection])
+async def introspect_tokens(
+    request: SIntrospectRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> list[STokenIntrospection]:
+    """Status and claims of access tokens, in the order of the request."""
+    return await IntrospectionService(session).introspect(request.tokens)
+
+
+@router.post("/ws-ticket/redeem", response_model=SWSTicketOwner)
+async def redeem_ws_ticket(request: SWSTicketRedeem) -> SWSTicketOwner:
+    """Consume WebSocket ticket and return its user and device."""
+    return await ws_ticket_service.redeem(request.ticket)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Response
+
+from src.dependencies import verify_internal_api_key
+from src.utils.metrics import generate_metrics
+from src.utils.profiling import ProfiledRoute
+
+router = APIRouter(
+    tags=["metrics"],
+    dependencies=[Depends(verify_internal_api_key)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Prometheus metrics of all workers."""
+    content, content_type = generate_metrics()
+    return Response(content, media_type=content_type)
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends
 
-from src.core.database.models.user import User
-from src.core.schemas.user_schemas import SUserMe
-from src.dependencies import get_current_active_user
+from src.core.schemas.user_schemas import SUserMe, UserDTO
+from src.dependencies import get_current_active_principal
+from src.utils.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=ProfiledRoute)
 
 
 @router.get("/me", response_model=SUserMe)
 async def get_my_user_info(
-    user: User = Depends(get_current_active_user),
+    user: UserDTO = Depends(get_current_active_principal),
 ) -> SUserMe:
-    return SUserMe.from_orm(user)
+    return SUserMe.model_validate(user)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Header, Response
+from starlette import status
+
+from src.config import settings
+from src.utils.jwt_keys import jwt_key_manager
+from src.utils.profiling import ProfiledRoute
+
+router = APIRouter(
+    prefix="/.well-known", tags=["well-known"], route_class=ProfiledRoute
+)
+
+
+@router.get("/jwks.json")
+async def get_jwks(if_none_match: str | None = Header(None)) -> Response:
+    """Public keys which verify access tokens, selected by kid of the token header."""
+    headers = {
+        "ETag": jwt_key_manager.jwks_etag,
+        "Cache-Control": f"public, max-age={settings.JWT.JWKS_MAX_AGE}",
+    }
+    if if_none_match is not None and (
+        if_none_match.strip() == "*"
+        or jwt_key_manager.jwks_etag
+        in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=jwt_key_manager.jwks, media_type="application/json", headers=headers
+    )
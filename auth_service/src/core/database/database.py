@@ -3,10 +3,41 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from src.config import settings
+from src.utils import metrics, profiling
+from .pool import PoolStats
+from .slow_query import SlowQueryLog
 
-engine = create_async_engine(settings.DB.url)
+engine = create_async_engine(
+    settings.DB.url,
+    pool_size=settings.DB.POOL_SIZE,
+    max_overflow=settings.DB.MAX_OVERFLOW,
+    pool_timeout=settings.DB.POOL_TIMEOUT,
+    pool_recycle=settings.DB.POOL_RECYCLE,
+    pool_pre_ping=settings.DB.POOL_PRE_PING,
+    connect_args={
+        # Cache of asyncpg and cache of SQLAlchemy asyncpg dialect.
+        "statement_cache_size": settings.DB.STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB.STATEMENT_CACHE_SIZE,
+        "server_settings": {"application_name": settings.DB.APPLICATION_NAME},
+    },
+)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+pool_stats = PoolStats()
+pool_stats.listen(engine)
+metrics.instrument_engine(engine)
+metrics.register_pool(engine, pool_stats)
+profiling.instrument_engine(engine)
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY.THRESHOLD,
+    explain=settings.SLOW_QUERY.EXPLAIN,
+    explain_timeout=settings.SLOW_QUERY.EXPLAIN_TIMEOUT,
+    report_size=settings.SLOW_QUERY.REPORT_SIZE,
+)
+if settings.SLOW_QUERY.ENABLED:
+    slow_query_log.listen(engine)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -3,3 +3,4 @@
 from .base import Base
 from .user import User
 from .device import Device
+from .outbox import OutboxEvent
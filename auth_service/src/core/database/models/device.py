@@ -1,7 +1,8 @@
+import datetime
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID, ForeignKey, String
+from sqlalchemy import UUID, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -16,15 +17,36 @@ class Device(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("user.id"), index=True
+        UUID(as_uuid=True), ForeignKey("user.id")
     )
     user_agent: Mapped[str] = mapped_column(String(length=255), nullable=False)
     ip: Mapped[str] = mapped_column(String(length=45), nullable=False)
-    location: Mapped[str] = mapped_column(String(length=255), nullable=False)
-    jti: Mapped[uuid.UUID] = mapped_column(nullable=False, index=True)  # refresh JWT id
+    # None while the location is resolved by DeviceLocationEnricher.
+    location: Mapped[str | None] = mapped_column(String(length=255), nullable=True)
+    jti: Mapped[uuid.UUID] = mapped_column(nullable=False)  # refresh JWT id
+    # Expiration of the refresh token, expired devices are deleted by SessionSweeper.
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
 
     user: Mapped["User"] = relationship(back_populates="devices")
 
+    # Devices are always looked up within one user, so user_id leads every index.
+    __table_args__ = (
+        Index("ix_device_user_id_jti", "user_id", "jti", unique=True),
+        # Device list of the user (SDeviceGet) is read by an index only scan.
+        Index(
+            "ix_device_user_id_list",
+            "user_id",
+            postgresql_include=["id", "user_agent", "ip", "location"],
+        ),
+        Index(
+            "ix_device_pending_location",
+            "id",
+            postgresql_where=location.is_(None),
+        ),
+    )
+
     def __repr__(self):
         return f"<Device(user_id={self.user_id})>"
 
@@ -0,0 +1,20 @@
+from typing import Any
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """Event written in the transaction of the change, published later by OutboxRelay."""
+
+    __tablename__ = "outbox_event"
+    # Sequential id keeps the order of events.
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type})>"
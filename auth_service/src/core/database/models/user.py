@@ -1,6 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -12,7 +13,8 @@ if TYPE_CHECKING:
 class User(Base):
     __tablename__ = "user"
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    email: Mapped[str] = mapped_column(nullable=False, unique=True)
+    # Unique case-insensitively by ix_user_email_lower, stored as entered.
+    email: Mapped[str] = mapped_column(nullable=False)
     password: Mapped[str] = mapped_column(nullable=False)
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
     is_superuser: Mapped[bool] = mapped_column(nullable=False, default=False)
@@ -20,6 +22,8 @@ class User(Base):
 
     devices: Mapped[list["Device"]] = relationship(back_populates="user")
 
+    __table_args__ = (Index("ix_user_email_lower", func.lower(email), unique=True),)
+
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
 
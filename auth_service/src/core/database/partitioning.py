@@ -0,0 +1,295 @@
+"""
+Online migration of the device table into a table hash partitioned by user_id.
+
+Every query of DeviceRepository on the hot path filters by user_id, so Postgres
+prunes it to one partition, and the model stays the same. The primary key
+becomes (id, user_id), because unique keys of a partitioned table must contain
+the partition key.
+
+Steps, every one is safe to repeat if the script is interrupted:
+    1. device_partitioned with the same columns and indexes is created, a trigger
+       mirrors every change of device into it;
+    2. rows are copied in batches ordered by id, locked FOR SHARE until the batch
+       commits, so concurrent changes are mirrored after the copy;
+    3. under a short ACCESS EXCLUSIVE lock the tables and their indexes swap names,
+       the old table is kept as device_old until --drop-old. The lock is waited for
+       at most --lock-timeout seconds, queries of device queue behind the waiting
+       lock, so the swap is retried with backoff instead of waiting longer.
+
+Run from the auth_service directory:
+    python -m src.core.database.partitioning --partitions 16 [--drop-old]
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "device"
+NEW_TABLE = "device_partitioned"
+OLD_TABLE = "device_old"
+PARTITION = "device_p{}"
+TRIGGER = "device_partitioning_mirror"
+# Suffix of indexes of the new table until the swap.
+NEW_SUFFIX = "_partitioned"
+LOCK_NOT_AVAILABLE = "55P03"
+
+_PARTITIONING_TABLES = re.compile(rf"^({NEW_TABLE}|{OLD_TABLE}|device_p\d+)$")
+
+MIRROR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {TRIGGER}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {NEW_TABLE} SELECT (NEW).* ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+COPY_BATCH = f"""
+WITH batch AS (
+    SELECT * FROM {TABLE} WHERE id > :after ORDER BY id LIMIT :limit FOR SHARE
+), copied AS (
+    INSERT INTO {NEW_TABLE} SELECT * FROM batch ON CONFLICT DO NOTHING
+)
+SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1), (SELECT count(*) FROM batch)
+"""
+
+
+def is_partitioning_table(name: str) -> bool:
+    """Tables of the migration and partitions, which aren't in the models."""
+    return _PARTITIONING_TABLES.match(name) is not None
+
+
+class DevicePartitioner:
+    def __init__(self, engine: AsyncEngine, partitions: int, batch_size: int):
+        self._engine = engine
+        self._partitions = partitions
+        self._batch_size = batch_size
+
+    @staticmethod
+    async def _relkind(conn: AsyncConnection, table: str) -> str | None:
+        return await conn.scalar(
+            text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+
+    async def is_partitioned(self) -> bool:
+        async with self._engine.connect() as conn:
+            return await self._relkind(conn, TABLE) == "p"
+
+    async def prepare(self) -> None:
+        """Create the partitioned table with indexes of device and the mirror trigger."""
+        async with self._engine.begin() as conn:
+            if await self._relkind(conn, NEW_TABLE) is None:
+                await self._create_table(conn)
+            await conn.execute(text(MIRROR_FUNCTION))
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {TRIGGER} ON {TABLE}"))
+            await conn.execute(
+                text(
+                    f"CREATE TRIGGER {TRIGGER} AFTER INSERT OR UPDATE OR DELETE "
+                    f"ON {TABLE} FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()"
+                )
+            )
+
+    async def _create_table(self, conn: AsyncConnection) -> None:
+        await conn.execute(
+            text(
+                f"CREATE TABLE {NEW_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS) "
+                "PARTITION BY HASH (user_id)"
+            )
+        )
+        for remainder in range(self._partitions):
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {PARTITION.format(remainder)} "
+                    f"PARTITION OF {NEW_TABLE} FOR VALUES "
+                    f"WITH (MODULUS {self._partitions}, REMAINDER {remainder})"
+                )
+            )
+        await conn.execute(
+            text(
+                f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {TABLE}_pkey{NEW_SUFFIX} "
+                "PRIMARY KEY (id, user_id)"
+            )
+        )
+        await conn.execute(
+            text(
+                f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT "
+                f"{TABLE}_user_id_fkey{NEW_SUFFIX} "
+                'FOREIGN KEY (user_id) REFERENCES "user" (id)'
+            )
+        )
+        # Indexes are copied from the database, so they match the applied migrations.
+        indexes = await conn.execute(
+            text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = :table "
+                "AND indexname != :pkey"
+            ),
+            {"table": TABLE, "pkey": f"{TABLE}_pkey"},
+        )
+        for name, definition in indexes.all():
+            definition = definition.replace(
+                f"INDEX {name} ON", f"INDEX {name}{NEW_SUFFIX} ON", 1
+            )
+            definition = re.sub(
+                rf" ON (\w+\.)?{TABLE} ", f" ON {NEW_TABLE} ", definition, count=1
+            )
+            await conn.execute(text(definition))
+
+    async def copy_batch(self, after: uuid.UUID) -> tuple[uuid.UUID | None, int]:
+        """Copy devices with id greater than after. Return last copied id and count."""
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                text(COPY_BATCH), {"after": after, "limit": self._batch_size}
+            )
+            last_id, count = result.one()
+        return last_id, count
+
+    async def copy(self, pause: float = 0) -> int:
+        """Copy all devices batch by batch. Return number of copied devices."""
+        after: uuid.UUID = uuid.UUID(int=0)
+        copied = 0
+        while True:
+            last_id, count = await self.copy_batch(after)
+            copied += count
+            if count < self._batch_size:
+                return copied
+            after = last_id
+            logger.info("Copied %d devices", copied)
+            await asyncio.sleep(pause)
+
+    async def _index_names(self, conn: AsyncConnection, table: str) -> list[str]:
+        result = await conn.execute(
+            text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = :table"
+            ),
+            {"table": table},
+        )
+        return list(result.scalars())
+
+    async def swap(self, lock_timeout: float = 2, attempts: int = 5) -> None:
+        """
+        Replace device by the partitioned table. Device is blocked for milliseconds
+        after the lock is taken and at most lock_timeout while it is waited for.
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                await self._swap(lock_timeout)
+                return
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+                    raise
+                if attempt == attempts:
+                    raise
+                logger.warning(
+                    "Table %s is locked, swap attempt %d failed", TABLE, attempt
+                )
+                await asyncio.sleep(lock_timeout * 2 ** (attempt - 1))
+
+    async def _swap(self, lock_timeout: float) -> None:
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                text(f"SET LOCAL lock_timeout = '{int(lock_timeout * 1000)}ms'")
+            )
+            await conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+            await conn.execute(text(f"DROP TRIGGER {TRIGGER} ON {TABLE}"))
+            await conn.execute(text(f"DROP FUNCTION {TRIGGER}()"))
+
+            old_indexes: list[str] = await self._index_names(conn, TABLE)
+            new_indexes: list[str] = await self._index_names(conn, NEW_TABLE)
+            await conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}"))
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT "
+                    f"{TABLE}_user_id_fkey TO {OLD_TABLE}_user_id_fkey"
+                )
+            )
+            for name in old_indexes:
+                # Constraint of the primary key is renamed with its index.
+                await conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_old"))
+
+            await conn.execute(text(f"ALTER TABLE {NEW_TABLE} RENAME TO {TABLE}"))
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {TABLE} RENAME CONSTRAINT "
+                    f"{TABLE}_user_id_fkey{NEW_SUFFIX} TO {TABLE}_user_id_fkey"
+                )
+            )
+            for name in new_indexes:
+                await conn.execute(
+                    text(
+                        f"ALTER INDEX {name} RENAME TO {name.removesuffix(NEW_SUFFIX)}"
+                    )
+                )
+
+    async def drop_old(self) -> None:
+        async with self._engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {OLD_TABLE}"))
+
+    async def run(
+        self,
+        pause: float = 0,
+        drop_old: bool = False,
+        lock_timeout: float = 2,
+        swap_attempts: int = 5,
+    ) -> None:
+        if await self.is_partitioned():
+            logger.info("Table %s is already partitioned", TABLE)
+        else:
+            await self.prepare()
+            copied: int = await self.copy(pause)
+            logger.info("Copied %d devices, swapping tables", copied)
+            await self.swap(lock_timeout, swap_attempts)
+        if drop_old:
+            await self.drop_old()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Partition device table by hash of user_id."
+    )
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--pause", type=float, default=0.05, help="Seconds between batches"
+    )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=2,
+        help=f"Seconds to wait for the lock of {TABLE} in one swap attempt",
+    )
+    parser.add_argument("--swap-attempts", type=int, default=5)
+    parser.add_argument(
+        "--drop-old", action="store_true", help=f"Drop {OLD_TABLE} after the swap"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine: AsyncEngine = create_async_engine(settings.DB.url)
+    try:
+        await DevicePartitioner(engine, args.partitions, args.batch_size).run(
+            args.pause, args.drop_old, args.lock_timeout, args.swap_attempts
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Counters of connection pool events of the engine."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+
+    def listen(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+        event.listen(engine.sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *args) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, *args) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, *args) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, *args) -> None:
+        self.invalidations += 1
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int) -> None:
+    """Open size connections at once, so first requests don't wait for connecting."""
+    connections: list[AsyncConnection] = []
+    try:
+        for result in await asyncio.gather(
+            *(engine.connect().start() for _ in range(size)), return_exceptions=True
+        ):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to open database connection: %r", result)
+            else:
+                connections.append(result)
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections))
+    logger.info("Database pool warmed up with %d connections", len(connections))
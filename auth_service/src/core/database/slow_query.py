@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import greenlet
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils import sql_timing
+from src.utils.sql_timing import listen_statements
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+# Frames of the statement listeners, they aren't callers.
+_LISTENER_FILES: set[str] = {__file__, sql_timing.__file__}
+
+# Statements of EXPLAIN, which must not be logged or explained themselves.
+IGNORE_OPTION = "slow_query_log_ignore"
+
+_PARAMETER_LISTS = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")
+_NUMBERS = re.compile(r"\b\d+\b")
+_SPACES = re.compile(r"\s+")
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE
+)
+
+
+def fingerprint(statement: str) -> str:
+    """Id of the statement with lists of parameters and numbers collapsed."""
+    normalized: str = _SPACES.sub(" ", statement).strip()
+    normalized = _PARAMETER_LISTS.sub("?", normalized)
+    normalized = _NUMBERS.sub("N", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def is_read_only(statement: str) -> bool:
+    """SELECT without a locking clause, it is safe to execute by EXPLAIN ANALYZE."""
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    return _LOCKING_CLAUSE.search(statement) is None
+
+
+def parameters_shape(parameters, executemany: bool) -> str:
+    """Types of bound parameters. Values aren't logged, they may be secrets."""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameters_shape(rows[0], False) if rows else '()'}"
+    values = parameters.values() if isinstance(parameters, dict) else parameters
+    types: list[str] = []
+    for value in values or ():
+        if isinstance(value, (list, tuple)):
+            types.append(f"{type(value).__name__}[{len(value)}]")
+        else:
+            types.append(type(value).__name__)
+    return f"({', '.join(types)})"
+
+
+def find_caller() -> str:
+    """
+    First frame of the service code which executed the statement. Statements run in
+    a greenlet, its parent greenlet holds the frames of the awaiting coroutines.
+    """
+    frames = [sys._getframe(1)]
+    parent = greenlet.getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        frames.append(parent.gr_frame)
+    for frame in frames:
+        while frame is not None:
+            filename: str = frame.f_code.co_filename
+            if filename.startswith(SRC_DIR) and filename not in _LISTENER_FILES:
+                relative: str = os.path.relpath(filename, os.path.dirname(SRC_DIR))
+                return f"{frame.f_code.co_qualname} ({relative}:{frame.f_lineno})"
+            frame = frame.f_back
+    return "unknown"
+
+
+@dataclass
+class SlowQuery:
+    """Slow statements with the same fingerprint."""
+
+    fingerprint: str
+    statement: str
+    parameters: str
+    calls: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    callers: set[str] = field(default_factory=set)
+    plan: str | None = None
+
+
+class SlowQueryLog:
+    """
+    Logs statements of the engine which run longer than threshold seconds with
+    the shape of parameters and the caller, and collects them by fingerprint into
+    the report. With explain, every new fingerprint is explained in the background:
+    read only SELECTs by EXPLAIN (ANALYZE, BUFFERS) in a transaction which is rolled
+    back, DML and locking SELECTs by EXPLAIN (VERBOSE) without executing them.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        explain: bool = False,
+        explain_timeout: float = 5,
+        report_size: int = 1000,
+    ):
+        self.threshold = threshold
+        self._explain = explain
+        self._explain_timeout = explain_timeout
+        self._report_size = report_size
+        self._report: OrderedDict[str, SlowQuery] = OrderedDict()
+        self._pending: asyncio.Queue[tuple[str, tuple]] = asyncio.Queue()
+        self._engine: AsyncEngine | None = None
+        self._task: asyncio.Task | None = None
+
+    def listen(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        listen_statements(engine, self._observe)
+
+    def report(self) -> list[SlowQuery]:
+        """Slow statements, the longest in total first."""
+        return sorted(
+            self._report.values(), key=lambda query: query.total_time, reverse=True
+        )
+
+    def _observe(self, statement, parameters, context, executemany, duration):
+        if duration < self.threshold or context.execution_options.get(IGNORE_OPTION):
+            return
+
+        query_id: str = fingerprint(statement)
+        shape: str = parameters_shape(parameters, executemany)
+        caller: str = find_caller()
+        logger.warning(
+            "Slow query",
+            extra={
+                "sql": statement,
+                "parameters": shape,
+                "duration_ms": round(duration * 1000, 2),
+                "caller": caller,
+                "fingerprint": query_id,
+            },
+        )
+
+        query: SlowQuery | None = self._report.get(query_id)
+        if query is None:
+            query = SlowQuery(query_id, statement, shape)
+            self._report[query_id] = query
+            while len(self._report) > self._report_size:
+                self._report.popitem(last=False)
+            # Executemany statements aren't explained, one row is not representative.
+            if self._explain and not executemany:
+                self._pending.put_nowait((query_id, tuple(parameters)))
+        query.calls += 1
+        query.total_time += duration
+        query.max_time = max(query.max_time, duration)
+        query.callers.add(caller)
+
+    async def explain(self, query_id: str, parameters: tuple) -> None:
+        query: SlowQuery | None = self._report.get(query_id)
+        if query is None or self._engine is None:
+            return
+        # ANALYZE executes the statement. DML and locking SELECTs would take row locks,
+        # consume sequences and may fail on constraints, so they are only planned.
+        options: str = (
+            "ANALYZE, BUFFERS" if is_read_only(query.statement) else "VERBOSE"
+        )
+        async with self._engine.connect() as conn:
+            conn = await conn.execution_options(**{IGNORE_OPTION: True})
+            await conn.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(self._explain_timeout * 1000)}"
+            )
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN ({options}) {query.statement}", parameters
+            )
+            query.plan = "\n".join(row[0] for row in result)
+            await conn.rollback()
+        logger.info("Explained slow query %s", query_id, extra={"plan": query.plan})
+
+    async def run_once(self) -> int:
+        """Explain pending statements. Return number of explained statements."""
+        explained = 0
+        while not self._pending.empty():
+            query_id, parameters = self._pending.get_nowait()
+            try:
+                await self.explain(query_id, parameters)
+                explained += 1
+            except SQLAlchemyError:
+                logger.exception("Failed to explain slow query %s", query_id)
+        return explained
+
+    async def run(self) -> None:
+        while True:
+            query_id, parameters = await self._pending.get()
+            try:
+                await self.explain(query_id, parameters)
+            except SQLAlchemyError:
+                logger.exception("Failed to explain slow query %s", query_id)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,21 @@
+import pika
+
+from src.config import settings
+from .in_memory import InMemoryPublisher
+from .publisher import RabbitMQPublisher
+
+
+def create_publisher() -> RabbitMQPublisher | InMemoryPublisher:
+    """Return RabbitMQ publisher or in memory stand-in if RMQ_USE_IN_MEMORY is set."""
+    if settings.RMQ.USE_IN_MEMORY:
+        return InMemoryPublisher()
+    parameters = pika.ConnectionParameters(
+        host=settings.RMQ.HOST,
+        port=settings.RMQ.PORT,
+        virtual_host=settings.RMQ.VIRTUAL_HOST,
+        credentials=pika.PlainCredentials(settings.RMQ.USERNAME, settings.RMQ.PASSWORD),
+    )
+    return RabbitMQPublisher(parameters, settings.RMQ.EXCHANGE)
+
+
+publisher: RabbitMQPublisher | InMemoryPublisher = create_publisher()
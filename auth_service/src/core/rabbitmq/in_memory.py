@@ -0,0 +1,20 @@
+from src.core.schemas.outbox import OutboxEventDTO
+
+
+class InMemoryPublisher:
+    """
+    Process local stand-in for RabbitMQPublisher used in tests and local development.
+    Published events are kept in the messages list as (routing key, body).
+    """
+
+    def __init__(self):
+        self.messages: list[tuple[str, bytes]] = []
+        self.fail: bool = False  # Simulate unavailable broker.
+
+    async def publish_batch(self, events: list[OutboxEventDTO]) -> None:
+        if self.fail:
+            raise ConnectionError("Broker is unavailable.")
+        self.messages += [(event.event_type, event.message_body()) for event in events]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+from pika.adapters.blocking_connection import BlockingChannel, BlockingConnection
+from pika.exceptions import AMQPError
+
+from src.core.schemas.outbox import OutboxEventDTO
+
+logger = logging.getLogger(__name__)
+
+
+class RabbitMQPublisher:
+    """
+    Publishes events to a topic exchange with publisher confirms: publish_batch()
+    returns only after the broker confirmed every message, so the relay deletes
+    only events which are stored by the broker.
+    pika connections are not thread safe, so all I/O runs in one dedicated thread
+    and never blocks the event loop.
+    """
+
+    def __init__(self, parameters: pika.ConnectionParameters, exchange: str):
+        self._parameters = parameters
+        self._exchange = exchange
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rmq")
+        self._connection: BlockingConnection | None = None
+        self._channel: BlockingChannel | None = None
+
+    def _get_channel(self) -> BlockingChannel:
+        if self._channel is None or self._channel.is_closed:
+            self._close()
+            self._connection = pika.BlockingConnection(self._parameters)
+            self._channel = self._connection.channel()
+            self._channel.exchange_declare(
+                self._exchange, exchange_type="topic", durable=True
+            )
+            self._channel.confirm_delivery()
+        return self._channel
+
+    def _publish_batch(self, events: list[OutboxEventDTO]) -> None:
+        try:
+            channel: BlockingChannel = self._get_channel()
+            for event in events:
+                # Raises NackError if the broker didn't store the message.
+                channel.basic_publish(
+                    self._exchange,
+                    event.event_type,
+                    event.message_body(),
+                    properties=pika.BasicProperties(
+                        content_type="application/json",
+                        delivery_mode=pika.DeliveryMode.Persistent,
+                        message_id=str(event.id),
+                    ),
+                )
+        except AMQPError:
+            self._close()
+            raise
+
+    def _close(self) -> None:
+        if self._connection is not None and self._connection.is_open:
+            try:
+                self._connection.close()
+            except AMQPError:
+                logger.warning("Failed to close RabbitMQ connection", exc_info=True)
+        self._connection = self._channel = None
+
+    async def publish_batch(self, events: list[OutboxEventDTO]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._publish_batch, events)
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,25 @@
+from redis.asyncio import Redis
+
+from src.config import settings
+from .in_memory import InMemoryRedis
+
+
+def create_redis() -> Redis | InMemoryRedis:
+    """Return Redis client or in memory stand-in if REDIS_USE_IN_MEMORY is set."""
+    if settings.REDIS.USE_IN_MEMORY:
+        return InMemoryRedis()
+    return Redis(
+        host=settings.REDIS.HOST,
+        port=settings.REDIS.PORT,
+        password=settings.REDIS.PASSWORD or None,
+        db=settings.REDIS.DEFAULT_DB,
+        socket_timeout=settings.REDIS.SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS.SOCKET_TIMEOUT,
+    )
+
+
+redis_client: Redis | InMemoryRedis = create_redis()
+
+
+def get_redis() -> Redis | InMemoryRedis:
+    return redis_client
@@ -0,0 +1,167 @@
+import asyncio
+import fnmatch
+import time
+from typing import Any, AsyncIterator
+
+
+class InMemoryPubSub:
+    """Stand-in for redis.asyncio.client.PubSub of InMemoryRedis."""
+
+    def __init__(self, redis: "InMemoryRedis"):
+        self._redis = redis
+        self._messages: asyncio.Queue[dict] = asyncio.Queue()
+        self.channels: set[bytes] = set()
+
+    def _put(self, message: dict) -> None:
+        self._messages.put_nowait(message)
+
+    async def subscribe(self, *channels: Any) -> None:
+        for channel in map(InMemoryRedis._encode, channels):
+            self.channels.add(channel)
+            self._redis._subscribers.setdefault(channel, set()).add(self)
+            self._put({"type": "subscribe", "channel": channel, "data": 1})
+
+    async def unsubscribe(self, *channels: Any) -> None:
+        for channel in map(InMemoryRedis._encode, channels or list(self.channels)):
+            self.channels.discard(channel)
+            self._redis._subscribers.get(channel, set()).discard(self)
+
+    async def listen(self) -> AsyncIterator[dict]:
+        while self.channels:
+            yield await self._messages.get()
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0
+    ) -> dict | None:
+        try:
+            message = await asyncio.wait_for(self._messages.get(), timeout or None)
+        except TimeoutError:
+            return None
+        if ignore_subscribe_messages and message["type"] != "message":
+            return None
+        return message
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class InMemoryRedis:
+    """
+    Process local stand-in for redis.asyncio.Redis used in tests and local development.
+    Implements only the commands used by the service, values are stored as bytes like in Redis.
+    """
+
+    def __init__(self):
+        self._data: dict[bytes, bytes] = {}
+        self._expires: dict[bytes, float] = {}
+        self._subscribers: dict[bytes, set[InMemoryPubSub]] = {}
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            return value.encode()
+        if isinstance(value, (int, float)):
+            return repr(value).encode()
+        raise TypeError(f"Invalid input of type {type(value).__name__!r}")
+
+    def _is_expired(self, key: bytes) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return True
+        return False
+
+    def _get(self, name: Any) -> bytes | None:
+        key = self._encode(name)
+        if self._is_expired(key):
+            return None
+        return self._data.get(key)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, name: Any) -> bytes | None:
+        return self._get(name)
+
+    async def set(
+        self,
+        name: Any,
+        value: Any,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+    ) -> bool | None:
+        key = self._encode(name)
+        if nx and self._get(key) is not None:
+            return None
+        self._data[key] = self._encode(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        elif px is not None:
+            self._expires[key] = time.monotonic() + px / 1000
+        return True
+
+    async def getdel(self, name: Any) -> bytes | None:
+        value = self._get(name)
+        if value is not None:
+            await self.delete(name)
+        return value
+
+    async def delete(self, *names: Any) -> int:
+        deleted = 0
+        for name in names:
+            key = self._encode(name)
+            if self._get(key) is not None:
+                deleted += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return deleted
+
+    async def exists(self, *names: Any) -> int:
+        return sum(self._get(name) is not None for name in names)
+
+    async def expire(self, name: Any, time_seconds: int) -> bool:
+        key = self._encode(name)
+        if self._get(key) is None:
+            return False
+        self._expires[key] = time.monotonic() + time_seconds
+        return True
+
+    async def ttl(self, name: Any) -> int:
+        key = self._encode(name)
+        if self._get(key) is None:
+            return -2
+        expires_at = self._expires.get(key)
+        if expires_at is None:
+            return -1
+        return round(expires_at - time.monotonic())
+
+    async def scan_iter(self, match: Any = None) -> AsyncIterator[bytes]:
+        pattern = self._encode(match).decode() if match is not None else "*"
+        for key in list(self._data):
+            if not self._is_expired(key) and fnmatch.fnmatchcase(key.decode(), pattern):
+                yield key
+
+    async def publish(self, channel: Any, message: Any) -> int:
+        channel = self._encode(channel)
+        subscribers = self._subscribers.get(channel, set())
+        for pubsub in subscribers:
+            pubsub._put(
+                {"type": "message", "channel": channel, "data": self._encode(message)}
+            )
+        return len(subscribers)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._expires.clear()
+        return True
@@ -1,14 +1,22 @@
+from datetime import datetime
 from uuid import UUID
 
 from sqlalchemy import (
+    case,
+    column,
     delete,
     Delete,
     CursorResult,
+    insert,
+    Insert,
     select,
     Select,
     Result,
+    String,
     update,
     Update,
+    Uuid,
+    values,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,11 +29,14 @@ class DeviceRepository:
         self._session = db_session
 
     async def create(self, device_dto: SDeviceCreate) -> DeviceDTO:
-        """Create new user device"""
-        device: Device = Device(**device_dto.model_dump())
-        self._session.add(device)
-        await self._session.flush()
-        await self._session.refresh(device)
+        """Create new user device by one INSERT ... RETURNING statement"""
+        stmt: Insert = (
+            insert(Device)
+            .values(**device_dto.model_dump())
+            .returning(*Device.__table__.columns)
+        )
+        result: Result = await self._session.execute(stmt)
+        device = result.one()
         await self._session.commit()
         return DeviceDTO.model_validate(device, from_attributes=True)
 
@@ -42,14 +53,76 @@ class DeviceRepository:
         return DeviceDTO.model_validate(device, from_attributes=True)
 
     async def get_user_devices(self, user_id: UUID) -> list[SDeviceGet]:
-        """Return list of user devices"""
-        stmt: Select = select(Device).where(Device.user_id == user_id)
+        """Return list of user devices. Only columns of ix_device_user_id_list are read"""
+        stmt: Select = select(
+            Device.id, Device.user_agent, Device.ip, Device.location
+        ).where(Device.user_id == user_id)
         result: Result = await self._session.execute(stmt)
         return [
             SDeviceGet.model_validate(device, from_attributes=True)
-            for device in result.scalars().all()
+            for device in result.all()
         ]
 
+    async def get_pending_locations(self, limit: int) -> list[tuple[UUID, str]]:
+        """
+        Return (id, ip) of devices with pending location. Rows aren't locked,
+        so logout and refresh never wait for the geolocation lookups.
+        """
+        stmt: Select = (
+            select(Device.id, Device.ip).where(Device.location.is_(None)).limit(limit)
+        )
+        result: Result = await self._session.execute(stmt)
+        return [(device_id, ip) for device_id, ip in result.all()]
+
+    async def set_locations(self, locations: list[tuple[UUID, str]]) -> None:
+        """
+        Set pending location of many devices by one UPDATE ... FROM (VALUES ...)
+        statement. Locations already set by other workers are kept.
+        """
+        device_locations = values(
+            column("id", Uuid), column("location", String), name="device_locations"
+        ).data(locations)
+        stmt: Update = (
+            update(Device)
+            .where(Device.id == device_locations.c.id, Device.location.is_(None))
+            .values(location=device_locations.c.location)
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def rotate_jti(
+        self,
+        user_id: UUID,
+        current_jti: UUID,
+        new_jti: UUID,
+        user_agent: str,
+        expires_at: datetime,
+    ) -> DeviceDTO | None:
+        """
+        Replace jti and expiration of the device by one conditional
+        UPDATE ... RETURNING statement. They are replaced only if user agent matches,
+        otherwise the returned device keeps current jti.
+        Return None if user has no device with current jti.
+        """
+        user_agent_matches = Device.user_agent == user_agent
+        stmt: Update = (
+            update(Device)
+            .where(Device.user_id == user_id, Device.jti == current_jti)
+            .values(
+                jti=case((user_agent_matches, new_jti), else_=Device.jti),
+                expires_at=case(
+                    (user_agent_matches, expires_at), else_=Device.expires_at
+                ),
+            )
+            .returning(*Device.__table__.columns)
+        )
+        result: Result = await self._session.execute(stmt)
+        device = result.one_or_none()
+        await self._session.commit()
+        if device is None:
+            return None
+        return DeviceDTO.model_validate(device, from_attributes=True)
+
     async def update(self, user_id: UUID, current_jti: UUID, **kwargs):
         """Update user device"""
         stmt: Update = (
@@ -62,15 +135,19 @@ class DeviceRepository:
             raise ValueError(f"User {user_id} have not device with jti {current_jti}.")
         await self._session.commit()
 
-    async def delete_by_user_id_and_jti(self, user_id: UUID, jti: UUID) -> None:
-        """Delete user device"""
-        stmt: Delete = delete(Device).where(
-            Device.user_id == user_id, Device.jti == jti
+    async def delete_by_user_id_and_jti(self, user_id: UUID, jti: UUID) -> UUID:
+        """Delete user device and return its id"""
+        stmt: Delete = (
+            delete(Device)
+            .where(Device.user_id == user_id, Device.jti == jti)
+            .returning(Device.id)
         )
-        result: CursorResult = await self._session.execute(stmt)
-        if result.rowcount == 0:
+        result: Result = await self._session.execute(stmt)
+        device_id: UUID | None = result.scalar_one_or_none()
+        if device_id is None:
             raise ValueError(f"User {user_id} have not device with jti {jti}.")
         await self._session.commit()
+        return device_id
 
     async def delete_by_user_id_and_device_id(
         self, user_id: UUID, device_id: UUID
@@ -84,10 +161,30 @@ class DeviceRepository:
             raise ValueError(f"User {user_id} have not device with id {device_id}.")
         await self._session.commit()
 
-    async def delete_all_user_devices(self, user_id: UUID) -> None:
-        """Delete all user devices"""
-        stmt: Delete = delete(Device).where(Device.user_id == user_id)
+    async def delete_expired(self, now: datetime, limit: int) -> int:
+        """
+        Delete up to limit devices expired before now and return their number.
+        Rows locked by other sweepers are skipped.
+        """
+        expired: Select = (
+            select(Device.id)
+            .where(Device.expires_at < now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt: Delete = delete(Device).where(Device.id.in_(expired.scalar_subquery()))
         result: CursorResult = await self._session.execute(stmt)
-        if result.rowcount == 0:
+        await self._session.commit()
+        return result.rowcount
+
+    async def delete_all_user_devices(self, user_id: UUID) -> list[UUID]:
+        """Delete all user devices and return their ids"""
+        stmt: Delete = (
+            delete(Device).where(Device.user_id == user_id).returning(Device.id)
+        )
+        result: Result = await self._session.execute(stmt)
+        device_ids: list[UUID] = list(result.scalars().all())
+        if not device_ids:
             raise ValueError(f"User {user_id} have not devices.")
         await self._session.commit()
+        return device_ids
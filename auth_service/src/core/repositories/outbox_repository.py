@@ -0,0 +1,44 @@
+from typing import Any
+
+from sqlalchemy import delete, Delete, insert, Insert, select, Select, Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database.models import OutboxEvent
+from src.core.schemas.outbox import OutboxEventDTO
+
+
+class OutboxRepository:
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def add(self, event_type: str, payload: dict[str, Any]) -> None:
+        """
+        Add event to the outbox. Doesn't commit, the event is committed
+        in one transaction with the change it describes.
+        """
+        stmt: Insert = insert(OutboxEvent).values(
+            event_type=event_type, payload=payload
+        )
+        await self._session.execute(stmt)
+
+    async def get_batch(self, limit: int) -> list[OutboxEventDTO]:
+        """
+        Return the oldest events and lock them until commit.
+        Events locked by other relays are skipped.
+        """
+        stmt: Select = (
+            select(OutboxEvent)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result: Result = await self._session.execute(stmt)
+        return [
+            OutboxEventDTO.model_validate(event) for event in result.scalars().all()
+        ]
+
+    async def delete(self, event_ids: list[int]) -> None:
+        """Delete published events"""
+        stmt: Delete = delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids))
+        await self._session.execute(stmt)
+        await self._session.commit()
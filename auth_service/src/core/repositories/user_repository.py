@@ -1,8 +1,23 @@
-from sqlalchemy import select, Select, Result, and_
+import uuid
+
+from sqlalchemy import (
+    select,
+    Select,
+    Result,
+    and_,
+    any_,
+    bindparam,
+    func,
+    Insert,
+    update,
+    Update,
+    Uuid,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database.models.user import User
-from src.core.schemas.user_schemas import SUserCreate
+from src.core.schemas.user_schemas import SUserCreate, UserDTO
 
 
 class UserRepository:
@@ -10,15 +25,54 @@ class UserRepository:
         self._session = db_session
 
     async def get_user_by_field(self, **kwargs) -> User | None:
-        """Get a user bu given fields"""
+        """Get a user bu given fields. Email is compared case-insensitively"""
         stmt: Select = select(User)
-        conditions = [getattr(User, field) == value for field, value in kwargs.items()]
+        conditions = [
+            (
+                func.lower(User.email) == func.lower(value)
+                if field == "email"
+                else getattr(User, field) == value
+            )
+            for field, value in kwargs.items()
+        ]
         stmt = stmt.where(and_(*conditions))
         result: Result = await self._session.execute(stmt)
         return result.scalars().first()
 
-    async def create_user(self, new_user: SUserCreate) -> User:
-        user: User = User(**new_user.model_dump())
-        self._session.add(user)
+    async def get_users_by_ids(self, user_ids: list[uuid.UUID]) -> list[UserDTO]:
+        """Get many users by one WHERE id = ANY(:ids) query"""
+        stmt: Select = select(
+            User.id, User.email, User.is_active, User.is_staff, User.is_superuser
+        ).where(User.id == any_(bindparam("ids", user_ids, type_=ARRAY(Uuid))))
+        result: Result = await self._session.execute(stmt)
+        return [UserDTO.model_validate(user) for user in result.all()]
+
+    async def insert_if_absent(self, new_user: SUserCreate) -> UserDTO | None:
+        """
+        Create a user by INSERT ... ON CONFLICT (lower(email)) DO NOTHING RETURNING.
+        Return None if the email is taken. Doesn't commit, so the caller can create
+        the user in one transaction with its first device.
+        """
+        stmt: Insert = (
+            pg_insert(User)
+            .values(**new_user.model_dump())
+            .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+            .returning(
+                User.id, User.email, User.is_active, User.is_staff, User.is_superuser
+            )
+        )
+        result: Result = await self._session.execute(stmt)
+        user = result.one_or_none()
+        if user is None:
+            return None
+        return UserDTO.model_validate(user)
+
+    async def update_user(self, user_id: uuid.UUID, **kwargs) -> User | None:
+        """Update given fields of the user and return the updated user"""
+        stmt: Update = (
+            update(User).where(User.id == user_id).values(**kwargs).returning(User)
+        )
+        result: Result = await self._session.execute(stmt)
+        user: User | None = result.scalar_one_or_none()
         await self._session.commit()
         return user
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class SPoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+
+
+class SSlowQuery(BaseModel):
+    """Slow statements with the same fingerprint, durations in milliseconds."""
+
+    fingerprint: str
+    statement: str
+    parameters: str
+    calls: int
+    total_ms: float
+    max_ms: float
+    callers: list[str]
+    plan: str | None
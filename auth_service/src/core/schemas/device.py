@@ -1,6 +1,7 @@
+import datetime
 import uuid
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 
 class DeviceDTO(BaseModel):
@@ -8,8 +9,9 @@ class DeviceDTO(BaseModel):
     user_id: uuid.UUID
     user_agent: str
     ip: str
-    location: str
+    location: str | None
     jti: uuid.UUID
+    expires_at: datetime.datetime
 
     class ConfigDict:
         from_attributes = True
@@ -19,12 +21,19 @@ class SDeviceGet(BaseModel):
     id: uuid.UUID
     user_agent: str
     ip: str
-    location: str
+    location: str | None
+
+    @computed_field
+    @property
+    def location_pending(self) -> bool:
+        return self.location is None
 
 
 class SDeviceCreate(BaseModel):
+    id: uuid.UUID
     user_id: uuid.UUID
     user_agent: str
     ip: str
-    location: str
+    location: str | None = None  # None means location will be resolved later
     jti: uuid.UUID
+    expires_at: datetime.datetime
@@ -0,0 +1,37 @@
+import datetime
+import enum
+import json
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AuthEvent(enum.StrEnum):
+    """Types of events published to RMQ_EXCHANGE, used as routing keys."""
+
+    USER_REGISTERED = "user.registered"
+    USER_LOGGED_IN = "user.logged_in"
+    DEVICE_LOGGED_OUT = "device.logged_out"
+    DEVICE_REVOKED = "device.revoked"
+    ALL_DEVICES_LOGGED_OUT = "user.all_devices_logged_out"
+
+
+class OutboxEventDTO(BaseModel):
+    id: int
+    event_type: str
+    payload: dict[str, Any]
+    created_at: datetime.datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    def message_body(self) -> bytes:
+        """Body of the RabbitMQ message. id lets consumers drop redelivered events."""
+        return json.dumps(
+            {
+                "id": self.id,
+                "type": self.event_type,
+                "occurred_at": self.created_at.isoformat(),
+                "data": self.payload,
+            },
+            separators=(",", ":"),
+        ).encode()
@@ -1,7 +1,27 @@
-from pydantic import BaseModel
+import uuid
+
+from pydantic import BaseModel, Field
+
+from src.config import settings
+from .user_schemas import UserDTO
 
 
 class SToken(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str = "Bearer"
+
+
+class SIntrospectRequest(BaseModel):
+    tokens: list[str] = Field(max_length=settings.INTROSPECTION.MAX_TOKENS)
+
+
+class STokenIntrospection(BaseModel):
+    """Status of one access token. Claims and user are set only for active tokens."""
+
+    active: bool
+    error: str | None = None
+    sub: uuid.UUID | None = None
+    sid: uuid.UUID | None = None
+    exp: int | None = None
+    user: UserDTO | None = None
@@ -21,3 +21,15 @@ class SUserMe(BaseModel):
     email: EmailStr
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserDTO(BaseModel):
+    """Snapshot of the user without password, used to authorize requests."""
+
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+
+    model_config = ConfigDict(from_attributes=True)
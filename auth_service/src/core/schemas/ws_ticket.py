@@ -0,0 +1,17 @@
+import uuid
+
+from pydantic import BaseModel
+
+
+class SWSTicket(BaseModel):
+    ticket: str
+    expires_in: int  # In seconds
+
+
+class SWSTicketRedeem(BaseModel):
+    ticket: str
+
+
+class SWSTicketOwner(BaseModel):
+    user_id: uuid.UUID
+    device_id: uuid.UUID | None
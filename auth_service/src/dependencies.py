@@ -1,13 +1,24 @@
 import logging
+import secrets
 
-from fastapi import Depends, Request
+from fastapi import Body, Depends, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.core.database.database import get_async_session
-from src.core.database.models.user import User
-from .exceptions import UserNotActiveException
+from src.core.schemas.user_schemas import UserDTO
+from .exceptions import (
+    UserNotActiveException,
+    InternalAccessDeniedException,
+    InvalidTokenException,
+    TooManyRequestsException,
+)
 from .services.auth_service import AuthService
+from .services.rate_limiter import rate_limiter
+from .services.token_cache import verified_token_cache
+from .services.token_denylist import token_denylist
 from .services.token_service import TokenService, TokenType
 from .utils.auth import get_user_agent as get_user_agent_auth
 
@@ -26,32 +37,118 @@ def get_token_service(
     return TokenService(session)
 
 
-async def get_current_auth_user(
+async def get_access_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+) -> dict:
+    """
+    Get payload of access token. Signature of the token is checked once per worker,
+    revocation on every request.
+    """
+    token: str = credentials.credentials
+    payload: dict | None = verified_token_cache.get(token)
+    if payload is None:
+        payload = TokenService.get_current_token_payload(token)
+        TokenService.check_token_type(payload, TokenType.ACCESS)
+        verified_token_cache.add(token, payload)
+    if await token_denylist.is_revoked(payload):
+        raise InvalidTokenException
+    return payload
+
+
+async def get_current_auth_user(
+    payload: dict = Depends(get_access_token_payload),
     token_service: TokenService = Depends(get_token_service),
-) -> User:
+) -> UserDTO:
     """Get current user from jwt token and check token type."""
-    payload: dict = token_service.get_current_token_payload(credentials.credentials)
-    token_service.check_token_type(payload, TokenType.ACCESS)
-    user: User = await token_service.get_user_from_jwt(payload=payload)
+    user: UserDTO = await token_service.get_user_from_jwt(payload=payload)
+    return user
+
+
+async def get_current_principal(
+    payload: dict = Depends(get_access_token_payload),
+    token_service: TokenService = Depends(get_token_service),
+) -> UserDTO:
+    """
+    Get current user from claims of the access token without the database.
+    Changes of the user apply only to new tokens, so use it for read-only endpoints.
+    Tokens without claims fall back to get_current_auth_user.
+    """
+    user: UserDTO | None = token_service.get_user_from_claims(payload)
+    if user is None:
+        user = await token_service.get_user_from_jwt(payload=payload)
     return user
 
 
 async def get_current_user_for_refresh(
     refresh_token: str, token_service: TokenService = Depends(get_token_service)
-) -> User:
+) -> UserDTO:
     """Get current user from jwt refresh token and check token type."""
     payload: dict = token_service.get_current_token_payload(refresh_token)
     token_service.check_token_type(payload, TokenType.REFRESH)
-    user: User = await token_service.get_user_from_jwt(payload=payload)
+    user: UserDTO = await token_service.get_user_from_jwt(payload=payload)
     return user
 
 
-def get_current_active_user(user: User = Depends(get_current_auth_user)) -> User:
+def get_current_active_user(
+    user: UserDTO = Depends(get_current_auth_user),
+) -> UserDTO:
+    if not user.is_active:
+        raise UserNotActiveException
+    return user
+
+
+def get_current_active_principal(
+    user: UserDTO = Depends(get_current_principal),
+) -> UserDTO:
     if not user.is_active:
         raise UserNotActiveException
     return user
 
 
 def get_user_agent(request: Request) -> str:
-    return get_user_agent_auth(dict(request.headers))
+    return get_user_agent_auth(request.headers)
+
+
+def verify_internal_api_key(x_internal_api_key: str | None = Header(None)) -> None:
+    """Allow request only with X-Internal-API-Key header of internal services."""
+    if (
+        settings.INTERNAL_API_KEY is None
+        or x_internal_api_key is None
+        or not secrets.compare_digest(x_internal_api_key, settings.INTERNAL_API_KEY)
+    ):
+        raise InternalAccessDeniedException
+
+
+def rate_limit(route: str):
+    """
+    Dependency which limits requests of the route by client ip and by email.
+    Limits are RATE_LIMIT_<route>_PER_IP, _PER_EMAIL and _WINDOW settings.
+    Add it to dependencies of the route, so it runs before hashing and SQL.
+    """
+
+    async def check_rate_limit(request: Request, email: EmailStr = Body()) -> None:
+        config = settings.RATE_LIMIT
+        if not config.ENABLED:
+            return
+        window: int = getattr(config, f"{route}_WINDOW")
+        retry_after: int = await rate_limiter.hit(
+            [
+                (
+                    f"{route.lower()}:ip:{request.client.host}",
+                    getattr(config, f"{route}_PER_IP"),
+                    window,
+                ),
+                (
+                    f"{route.lower()}:email:{email.lower()}",
+                    getattr(config, f"{route}_PER_EMAIL"),
+                    window,
+                ),
+            ]
+        )
+        if retry_after:
+            logger.warning(
+                "Rate limit of %s exceeded by %s", route, request.client.host
+            )
+            raise TooManyRequestsException(retry_after)
+
+    return check_rate_limit
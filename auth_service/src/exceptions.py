@@ -17,6 +17,11 @@ class UserAuthenticationException(HTTPException):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
 
 
+class UserAlreadyExistsException(HTTPException):
+    def __init__(self, detail="A user with this email already exists."):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
 class NotMatchPasswordException(HTTPException):
     def __init__(self, detail="Password does not match."):
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
@@ -45,3 +50,32 @@ class InvalidDeviceException(HTTPException):
 class DeviceNotExistsException(HTTPException):
     def __init__(self, detail="Device not exists."):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+class ServiceBusyException(HTTPException):
+    def __init__(self, detail="Service is busy. Try again later."):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail="Service is temporarily unavailable. Try again later."):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+
+class InternalAccessDeniedException(HTTPException):
+    def __init__(self, detail="Invalid internal API key."):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class InvalidWSTicketException(HTTPException):
+    def __init__(self, detail="Invalid or expired ticket."):
+        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, retry_after: int, detail="Too many requests. Try again later."):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -1,11 +1,76 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .api.auth import router as auth_router
+from .api.internal import router as internal_router
+from .api.metrics import router as metrics_router
 from .api.users import router as user_router
+from .api.well_known import router as well_known_router
 from .logger_configs.logging_config import setup_logging
+from .middlewares.metrics import MetricsMiddleware
+from .middlewares.profiling import ProfilingMiddleware
+from .services.token_denylist import token_denylist
+from .utils.auth import jwt_pool, password_pool
+from .utils.jwt_keys import jwt_key_manager
+from .config import settings
+from .core.rabbitmq.client import publisher
+from .core.database.database import engine, slow_query_log
+from .core.database.pool import warm_up_pool
+from .utils.location import ip_info_provider, get_geoip_database
+from .utils.metrics import mark_process_dead
+from .workers.device_location_enricher import device_location_enricher
+from .workers.outbox_relay import outbox_relay
+from .workers.session_sweeper import session_sweeper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jwt_key_manager.load()
+    await warm_up_pool(engine, settings.DB.POOL_SIZE)
+    password_pool.start()
+    jwt_pool.start()
+    await token_denylist.start()
+    ip_info_provider.start()
+    get_geoip_database()
+    if settings.USE_USER_GEOLOCATION:
+        device_location_enricher.start()
+    if settings.SESSION_SWEEPER.ENABLED:
+        session_sweeper.start()
+    if settings.OUTBOX.ENABLED:
+        outbox_relay.start()
+    if settings.SLOW_QUERY.ENABLED and settings.SLOW_QUERY.EXPLAIN:
+        slow_query_log.start()
+    yield
+    await slow_query_log.stop()
+    await outbox_relay.stop()
+    await publisher.close()
+    await session_sweeper.stop()
+    await token_denylist.stop()
+    await device_location_enricher.stop()
+    await ip_info_provider.close()
+    password_pool.shutdown()
+    jwt_pool.shutdown()
+    await engine.dispose()
+    mark_process_dead()
+
 
 setup_logging()
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(auth_router)
 app.include_router(user_router)
+app.include_router(internal_router)
+app.include_router(well_known_router)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+if settings.PROFILING.ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.PROFILING.SAMPLE_RATE,
+        sample_interval=settings.PROFILING.SAMPLE_INTERVAL,
+        output_dir=settings.PROFILING.OUTPUT_DIR,
+    )
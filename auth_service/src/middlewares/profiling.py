@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.profiling import StackSampler, profile_request
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Records time spent by every request in phases (deps, db, crypto, http).
+    The phases are sent in the Server-Timing header and logged as fields of
+    the "Request profiled" record. sample_rate of requests is also profiled by
+    the stack sampler, folded stacks are written to output_dir.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 0,
+        sample_interval: float = 0.005,
+        output_dir: str = "logs/profiles",
+    ):
+        self.app = app
+        self._sample_rate = sample_rate
+        self._sample_interval = sample_interval
+        self._output_dir = output_dir
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampler: StackSampler | None = None
+        if self._sample_rate and random.random() < self._sample_rate:
+            sampler = StackSampler(threading.get_ident(), self._sample_interval)
+            sampler.start()
+
+        status: int = 500
+        with profile_request() as timings:
+
+            async def send_with_timings(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timings)
+            finally:
+                route = scope.get("route")
+                route_path: str = route.path if route is not None else "unmatched"
+                duration: float = time.perf_counter() - timings.started_at
+                logger.info(
+                    "Request profiled",
+                    extra={
+                        "method": scope["method"],
+                        "route": route_path,
+                        "status": status,
+                        "duration_ms": round(duration * 1000, 2),
+                        **timings.log_fields(),
+                    },
+                )
+                if sampler is not None:
+                    sampler.stop()
+                    await asyncio.to_thread(
+                        self._write_profile, sampler, scope["method"], route_path
+                    )
+
+    def _write_profile(self, sampler: StackSampler, method: str, route: str) -> None:
+        os.makedirs(self._output_dir, exist_ok=True)
+        name: str = route.strip("/").replace("/", "_") or "root"
+        path: str = os.path.join(
+            self._output_dir, f"{time.time_ns()}-{method}-{name}.folded"
+        )
+        sampler.write(path)
+        logger.info("Request profile written to %s", path)
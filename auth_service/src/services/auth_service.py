@@ -1,25 +1,32 @@
 import logging
 import uuid
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.core.database.models.user import User
 from src.core.repositories.user_repository import UserRepository
 from src.core.schemas.token import SToken
-from src.core.schemas.user_schemas import SUserCreate
+from src.core.schemas.user_schemas import SUserCreate, UserDTO
 from src.exceptions import (
     UserAuthenticationException,
+    UserAlreadyExistsException,
     NotMatchPasswordException,
     InvalidTokenException,
     InvalidDeviceException,
     UserNotFoundException,
     DeviceNotExistsException,
 )
-from src.utils.auth import validate_password, hash_password
-from src.utils.location import get_location_by_ip
+from src.utils.auth import validate_password_async, hash_password_async
+from src.workers.device_location_enricher import device_location_enricher
+from src.workers.outbox_relay import outbox_relay
+from .token_denylist import token_denylist
 from .token_service import TokenService
 from ..core.repositories.device_repository import DeviceRepository
+from ..core.repositories.outbox_repository import OutboxRepository
 from ..core.schemas.device import DeviceDTO, SDeviceCreate, SDeviceGet
+from ..core.schemas.outbox import AuthEvent
 
 logger = logging.getLogger(__name__)
 
@@ -30,28 +37,51 @@ class AuthService:
         self._repository = UserRepository(self._session)
         self._token_service = TokenService(self._session)
 
+    @staticmethod
+    def _refresh_token_expires_at() -> datetime:
+        """Expiration of refresh tokens issued now, it is stored in the device."""
+        return datetime.now(timezone.utc) + timedelta(
+            minutes=settings.JWT.REFRESH_TOKEN_LIFE
+        )
+
+    async def _add_event(self, event_type: AuthEvent, **payload: str | None) -> None:
+        """Add event to the outbox. It is committed with the following change."""
+        await OutboxRepository(self._session).add(event_type, payload)
+
     async def _register_new_device(
         self,
+        device_id: uuid.UUID,
         user_id: uuid.UUID,
         user_agent: str,
         jti: uuid.UUID,
         ip: str,
     ) -> DeviceDTO:
-        location: str = await get_location_by_ip(ip)
-        if location is None:
-            raise InvalidDeviceException
-
+        """Create device. Its location is resolved later by DeviceLocationEnricher"""
+        # Without geolocation location is empty, otherwise it stays pending (None).
+        location: str | None = None if settings.USE_USER_GEOLOCATION else ""
         device: SDeviceCreate = SDeviceCreate(
-            user_id=user_id, user_agent=user_agent, ip=ip, location=location, jti=jti
+            id=device_id,
+            user_id=user_id,
+            user_agent=user_agent,
+            ip=ip,
+            location=location,
+            jti=jti,
+            expires_at=self._refresh_token_expires_at(),
         )
         device_repository: DeviceRepository = DeviceRepository(self._session)
         device: DeviceDTO = await device_repository.create(device)
+        if location is None:
+            device_location_enricher.notify()
         return device
 
-    def _generate_tokens(self, user: User) -> tuple[SToken, uuid.UUID]:
-        access_token: str = self._token_service.create_access_token(user)
-        refresh_token, jti = self._token_service.create_refresh_token(user)
-        return SToken(access_token=access_token, refresh_token=refresh_token), jti
+    def _generate_tokens(
+        self, user: User | UserDTO, device_id: uuid.UUID, jti: uuid.UUID
+    ) -> SToken:
+        access_token: str = self._token_service.create_access_token(user, device_id)
+        refresh_token: str = self._token_service.create_refresh_token(
+            user, device_id, jti
+        )
+        return SToken(access_token=access_token, refresh_token=refresh_token)
 
     async def login(
         self, email: str, password: str, user_agent: str, ip: str
@@ -61,53 +91,94 @@ class AuthService:
         if not user:
             raise UserNotFoundException
 
-        if not validate_password(password, user.password):
+        if not await validate_password_async(password, user.password):
             raise UserAuthenticationException
 
-        tokens, jti = self._generate_tokens(user)
+        device_id, jti = uuid.uuid4(), uuid.uuid4()
+        await self._add_event(
+            AuthEvent.USER_LOGGED_IN,
+            user_id=str(user.id),
+            device_id=str(device_id),
+            user_agent=user_agent,
+            ip=ip,
+        )
         device: DeviceDTO = await self._register_new_device(
-            user_id=user.id, user_agent=user_agent, jti=jti, ip=ip
+            device_id=device_id, user_id=user.id, user_agent=user_agent, jti=jti, ip=ip
         )
+        outbox_relay.notify()
+        tokens: SToken = self._generate_tokens(user, device_id, jti)
         logger.info("User %s logged in from device: %s", user.email, device.id)
         return tokens
 
-    async def logout(self, refresh_token: str) -> None:
-        """Logout user via delete user device"""
+    async def logout(
+        self, refresh_token: str, access_token_payload: dict | None = None
+    ) -> None:
+        """Logout user via delete user device and revoke its access tokens"""
         payload = self._token_service.get_current_token_payload(refresh_token)
 
+        await self._add_event(
+            AuthEvent.DEVICE_LOGGED_OUT,
+            user_id=payload["sub"],
+            device_id=payload.get("sid"),
+        )
         device_repository: DeviceRepository = DeviceRepository(self._session)
         try:
-            await device_repository.delete_by_user_id_and_jti(
+            device_id: uuid.UUID = await device_repository.delete_by_user_id_and_jti(
                 user_id=payload["sub"], jti=payload["jti"]
             )
         except ValueError:
             raise InvalidTokenException
+        outbox_relay.notify()
+
+        await token_denylist.revoke_sessions([device_id])
+        if access_token_payload is not None:
+            await token_denylist.revoke_token(access_token_payload)
 
     async def refresh_jwt_token(
-        self, refresh_token: str, user: User, user_agent: str
+        self, refresh_token: str, user: UserDTO, user_agent: str
     ) -> SToken:
-        """Generate new pair and add old refresh to blacklist"""
+        """
+        Rotate refresh token of the device by one conditional UPDATE.
+        Reuse of a rotated token revokes the device with all its refresh tokens.
+        """
         payload = self._token_service.get_current_token_payload(refresh_token)
         device_repository: DeviceRepository = DeviceRepository(self._session)
 
-        try:
-            device: DeviceDTO = await device_repository.get(user.id, payload.get("jti"))
-
-            # If user_agent not match this mean someone else tries to refresh the user JWT.
-            if device.user_agent != user_agent:
-                await device_repository.delete_by_user_id_and_jti(
-                    user_id=user.id, jti=payload["jti"]
-                )
-                raise InvalidDeviceException
-
-            tokens, jti = self._generate_tokens(user)
-            await device_repository.update(
-                user_id=user.id, current_jti=payload["jti"], jti=jti
-            )
-        except ValueError:
+        new_jti: uuid.UUID = uuid.uuid4()
+        device: DeviceDTO | None = await device_repository.rotate_jti(
+            user_id=user.id,
+            current_jti=payload["jti"],
+            new_jti=new_jti,
+            user_agent=user_agent,
+            expires_at=self._refresh_token_expires_at(),
+        )
+
+        if device is None:
+            # The token is already rotated or revoked, it may be stolen.
+            if "sid" in payload:
+                await self._revoke_device(user.id, uuid.UUID(payload["sid"]))
             raise InvalidTokenException
 
-        return tokens
+        # If user_agent not match this mean someone else tries to refresh the user JWT.
+        if device.jti != new_jti:
+            await self._revoke_device(user.id, device.id)
+            raise InvalidDeviceException
+
+        return self._generate_tokens(user, device.id, new_jti)
+
+    async def _revoke_device(self, user_id: uuid.UUID, device_id: uuid.UUID) -> None:
+        await self._add_event(
+            AuthEvent.DEVICE_REVOKED, user_id=str(user_id), device_id=str(device_id)
+        )
+        device_repository: DeviceRepository = DeviceRepository(self._session)
+        try:
+            await device_repository.delete_by_user_id_and_device_id(user_id, device_id)
+        except ValueError:
+            await self._session.rollback()
+            return
+        outbox_relay.notify()
+        await token_denylist.revoke_sessions([device_id])
+        logger.warning("Revoked device %s of user %s", device_id, user_id)
 
     async def register_user(
         self, email: str, password: str, re_password: str, ip: str, user_agent: str
@@ -120,43 +191,59 @@ class AuthService:
         if not user_agent or not ip:
             raise InvalidDeviceException
 
-        # Create new user
-        hashed_password = hash_password(password)
-        s_user = SUserCreate(email=email, password=hashed_password)
-
-        if await self._repository.get_user_by_field(email=s_user.email) is not None:
-            raise UserAuthenticationException(
-                detail="A user with this email already exists."
-            )
-
-        user = await self._repository.create_user(s_user)
-        tokens, jti = self._generate_tokens(user)
+        # Cheap indexed lookup first, so duplicate signups don't cost hashing.
+        if await self._repository.get_user_by_field(email=email) is not None:
+            raise UserAlreadyExistsException
 
-        # Create new user device
+        # Create new user. The insert is race-free if the email was taken meanwhile.
+        hashed_password = await hash_password_async(password)
+        s_user = SUserCreate(email=email, password=hashed_password)
+        user: UserDTO | None = await self._repository.insert_if_absent(s_user)
+        if user is None:
+            raise UserAlreadyExistsException
+
+        # Create new user device, its commit creates the user as well
+        device_id, jti = uuid.uuid4(), uuid.uuid4()
+        await self._add_event(
+            AuthEvent.USER_REGISTERED,
+            user_id=str(user.id),
+            email=user.email,
+            device_id=str(device_id),
+        )
         device: DeviceDTO = await self._register_new_device(
-            user.id, user_agent, jti, ip
+            device_id, user.id, user_agent, jti, ip
         )
+        outbox_relay.notify()
+        tokens: SToken = self._generate_tokens(user, device_id, jti)
         logger.info("Register user %s with device: %s", email, device.user_agent)
         return tokens
 
-    async def get_my_devices(self, user: User) -> list[SDeviceGet]:
+    async def get_my_devices(self, user: UserDTO) -> list[SDeviceGet]:
         """Return list of all user's devices '"""
         device_repository: DeviceRepository = DeviceRepository(self._session)
         devices = await device_repository.get_user_devices(user.id)
         return devices
 
-    async def logout_device(self, device_id: uuid.UUID, user: User) -> None:
+    async def logout_device(self, device_id: uuid.UUID, user: UserDTO) -> None:
         """Check permission and delete user device"""
+        await self._add_event(
+            AuthEvent.DEVICE_LOGGED_OUT, user_id=str(user.id), device_id=str(device_id)
+        )
         device_repository: DeviceRepository = DeviceRepository(self._session)
         try:
             await device_repository.delete_by_user_id_and_device_id(user.id, device_id)
         except ValueError:
             raise DeviceNotExistsException
+        outbox_relay.notify()
+        await token_denylist.revoke_sessions([device_id])
 
-    async def logout_all_devices(self, user: User) -> None:
+    async def logout_all_devices(self, user: UserDTO) -> None:
         """Logout from all user devices"""
+        await self._add_event(AuthEvent.ALL_DEVICES_LOGGED_OUT, user_id=str(user.id))
         device_repository: DeviceRepository = DeviceRepository(self._session)
         try:
-            await device_repository.delete_all_user_devices(user.id)
+            device_ids = await device_repository.delete_all_user_devices(user.id)
         except ValueError:
             raise DeviceNotExistsException
+        outbox_relay.notify()
+        await token_denylist.revoke_sessions(device_ids)
@@ -0,0 +1,74 @@
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.core.repositories.user_repository import UserRepository
+from src.core.schemas.token import STokenIntrospection
+from src.core.schemas.user_schemas import UserDTO
+from .token_cache import verified_token_cache
+from .token_denylist import token_denylist
+from .token_service import TokenType
+from ..utils.auth import decode_jwt_many_async
+
+
+class IntrospectionService:
+    """Checks batches of access tokens for internal services."""
+
+    def __init__(self, db_session: AsyncSession):
+        self._repository: UserRepository = UserRepository(db_session)
+
+    async def _verify(self, tokens: list[str]) -> list[dict | None]:
+        """Return payloads of tokens, None for invalid ones. Verifies only new tokens."""
+        payloads: list[dict | None] = [verified_token_cache.get(t) for t in tokens]
+        unverified: list[int] = [i for i, p in enumerate(payloads) if p is None]
+        decoded = await decode_jwt_many_async(
+            [tokens[i] for i in unverified],
+            inline_max=settings.INTROSPECTION.INLINE_MAX,
+            min_chunk_size=settings.INTROSPECTION.MIN_CHUNK_SIZE,
+            max_chunk_size=settings.INTROSPECTION.CHUNK_SIZE,
+        )
+        for i, payload in zip(unverified, decoded):
+            if payload is not None and payload.get(TokenType.TYPE) == TokenType.ACCESS:
+                verified_token_cache.add(tokens[i], payload)
+                payloads[i] = payload
+        return payloads
+
+    async def introspect(self, tokens: list[str]) -> list[STokenIntrospection]:
+        """Return status of every token in the same order. Users are read by one query"""
+        payloads: list[dict | None] = await self._verify(tokens)
+        for i, payload in enumerate(payloads):
+            if payload is not None and await token_denylist.is_revoked(payload):
+                payloads[i] = None
+
+        user_ids: set[uuid.UUID] = set()
+        for payload in payloads:
+            if payload is not None:
+                try:
+                    user_ids.add(uuid.UUID(payload["sub"]))
+                except (KeyError, ValueError):
+                    pass
+        users: dict[str, UserDTO] = {
+            str(user.id): user
+            for user in await self._repository.get_users_by_ids(list(user_ids))
+        }
+
+        results: list[STokenIntrospection] = []
+        for payload in payloads:
+            if payload is None:
+                results.append(STokenIntrospection(active=False, error="invalid_token"))
+                continue
+            user: UserDTO | None = users.get(payload.get("sub"))
+            if user is None or not user.is_active:
+                results.append(STokenIntrospection(active=False, error="inactive_user"))
+                continue
+            results.append(
+                STokenIntrospection(
+                    active=True,
+                    sub=user.id,
+                    sid=payload.get("sid"),
+                    exp=payload["exp"],
+                    user=user,
+                )
+            )
+        return results
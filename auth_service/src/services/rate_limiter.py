@@ -0,0 +1,109 @@
+import logging
+import math
+import secrets
+import time
+from collections import deque
+
+from redis.exceptions import RedisError
+
+from src.core.redis.client import redis_client
+from src.core.redis.in_memory import InMemoryRedis
+from src.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Sliding window log of every key is a sorted set of request timestamps.
+# KEYS: limited keys. ARGV: now in ms, unique member, then window in ms and limit
+# of every key. The request is recorded only if it fits all limits.
+# Returns 0 if the request is allowed, otherwise milliseconds to wait.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 * i + 1])
+    local limit = tonumber(ARGV[2 * i + 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local oldest_at = tonumber(oldest[2] or now)
+        retry_after = math.max(retry_after, oldest_at + window - now)
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, ARGV[2 * i + 1])
+end
+return 0
+"""
+
+
+class LocalSlidingWindow:
+    """Process local sliding window log, used without Redis."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._windows = TTLCache(maxsize)
+
+    def hit(self, limits: list[tuple[str, int, float]], now: float) -> float:
+        """Same as SLIDING_WINDOW_SCRIPT, in seconds."""
+        retry_after: float = 0
+        windows: list[deque[float]] = []
+        for key, limit, window in limits:
+            timestamps: deque[float] = self._windows.get(key) or deque()
+            while timestamps and timestamps[0] <= now - window:
+                timestamps.popleft()
+            if len(timestamps) >= limit:
+                oldest: float = timestamps[0] if timestamps else now
+                retry_after = max(retry_after, oldest + window - now)
+            windows.append(timestamps)
+        if retry_after > 0:
+            return retry_after
+
+        for (key, _, window), timestamps in zip(limits, windows):
+            timestamps.append(now)
+            self._windows.set(key, timestamps, window)
+        return 0
+
+
+class RateLimiter:
+    """
+    Sliding window rate limiter. All limits of a request are checked and recorded
+    by one atomic Lua script in Redis, so the limits are shared by all workers.
+    Without Redis (in memory stand-in or Redis errors) limits are kept per process.
+    """
+
+    KEY_PREFIX = "rate_limit:"
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._script = (
+            None
+            if isinstance(redis, InMemoryRedis)
+            else redis.register_script(SLIDING_WINDOW_SCRIPT)
+        )
+        self._local = LocalSlidingWindow()
+
+    async def hit(self, limits: list[tuple[str, int, float]]) -> int:
+        """
+        Record request limited by (key, limit, window in seconds) limits.
+        Return 0 if it is allowed, otherwise seconds to wait before retry.
+        """
+        now: float = time.time()
+        if self._script is not None:
+            args: list = [int(now * 1000), f"{now}:{secrets.token_hex(4)}"]
+            for _, limit, window in limits:
+                args += [int(window * 1000), limit]
+            try:
+                retry_after_ms: int = await self._script(
+                    keys=[f"{self.KEY_PREFIX}{key}" for key, _, _ in limits],
+                    args=args,
+                )
+                return math.ceil(retry_after_ms / 1000)
+            except RedisError:
+                logger.warning("Rate limiting falls back to local", exc_info=True)
+        return math.ceil(self._local.hit(limits, now))
+
+
+rate_limiter = RateLimiter(redis_client)
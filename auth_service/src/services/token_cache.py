@@ -0,0 +1,47 @@
+import hashlib
+import time
+
+from src.config import settings
+from src.utils.cache import TTLCache
+
+
+class VerifiedTokenCache:
+    """
+    Payloads of access tokens with an already verified signature.
+    Keys are sha256 digests of the tokens, entries expire together with the token.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize, name="verified_token")
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._cache.hit_ratio
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        return self._cache.get(self._digest(token))
+
+    def add(self, token: str, payload: dict) -> None:
+        ttl: float = payload["exp"] - time.time()
+        self._cache.set(self._digest(token), payload, ttl)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+verified_token_cache = VerifiedTokenCache(settings.JWT.VERIFIED_TOKEN_CACHE_SIZE)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Iterable
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.core.redis.client import redis_client
+from src.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenDenylist:
+    """
+    Denylist of revoked access tokens (jti) and sessions (sid, id of the device).
+    Revocations are stored in Redis until the revoked tokens expire. Every worker
+    keeps a Bloom filter of revocations, updated through Redis pub/sub, so tokens
+    which are not revoked are checked without network I/O.
+    If Redis is unavailable, tokens found in the Bloom filter are treated as revoked.
+    """
+
+    KEY_PREFIX = "denylist:"
+
+    def __init__(
+        self,
+        redis,
+        channel: str,
+        bloom_capacity: int,
+        bloom_error_rate: float,
+        rebuild_interval: float,
+    ):
+        self._redis = redis
+        self._channel = channel
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._rebuild_interval = rebuild_interval
+        self._bloom: BloomFilter = self._new_bloom()
+        self._next_bloom: BloomFilter | None = None
+        # Listener and periodic task both rebuild, only one rebuild runs at a time.
+        self._rebuild_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+
+    def _new_bloom(self) -> BloomFilter:
+        return BloomFilter(self._bloom_capacity, self._bloom_error_rate)
+
+    def _add_to_bloom(self, items: Iterable[str]) -> None:
+        for item in items:
+            self._bloom.add(item)
+            # Revocations received while the filter is rebuilt must not be lost.
+            if self._next_bloom is not None:
+                self._next_bloom.add(item)
+
+    @staticmethod
+    def _items(payload: dict) -> list[str]:
+        return [
+            f"{claim}:{payload[claim]}" for claim in ("jti", "sid") if claim in payload
+        ]
+
+    async def _revoke(self, items: dict[str, int]) -> None:
+        """Store {item: ttl} in Redis and notify other workers."""
+        self._add_to_bloom(items)
+        try:
+            for item, ttl in items.items():
+                await self._redis.set(f"{self.KEY_PREFIX}{item}", 1, ex=max(ttl, 1))
+            await self._redis.publish(self._channel, " ".join(items))
+        except RedisError:
+            logger.exception("Failed to store revocation of %s", ", ".join(items))
+
+    async def revoke_token(self, payload: dict) -> None:
+        """Revoke access token until it expires."""
+        if "jti" in payload:
+            ttl: int = int(payload["exp"] - time.time()) + 1
+            await self._revoke({f"jti:{payload['jti']}": ttl})
+
+    async def revoke_sessions(self, session_ids: Iterable[uuid.UUID]) -> None:
+        """Revoke all access tokens issued for the devices."""
+        # Access tokens issued before the revocation expire in ACCESS_TOKEN_LIFE.
+        ttl: int = settings.JWT.ACCESS_TOKEN_LIFE * 60
+        items = {f"sid:{session_id}": ttl for session_id in session_ids}
+        if items:
+            await self._revoke(items)
+
+    async def is_revoked(self, payload: dict) -> bool:
+        candidates: list[str] = [
+            item for item in self._items(payload) if item in self._bloom
+        ]
+        if not candidates:
+            return False
+        try:
+            return bool(
+                await self._redis.exists(
+                    *(f"{self.KEY_PREFIX}{item}" for item in candidates)
+                )
+            )
+        except RedisError:
+            logger.exception("Failed to check revocation of %s", ", ".join(candidates))
+            return True
+
+    async def rebuild(self) -> None:
+        """Rebuild the Bloom filter from Redis, dropping expired revocations."""
+        async with self._rebuild_lock:
+            bloom: BloomFilter = self._new_bloom()
+            self._next_bloom = bloom
+            try:
+                async for key in self._redis.scan_iter(match=f"{self.KEY_PREFIX}*"):
+                    bloom.add(key.decode().removeprefix(self.KEY_PREFIX))
+                self._bloom = bloom
+            finally:
+                self._next_bloom = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                # Revocations published before subscribing are read from Redis.
+                await self.rebuild()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._add_to_bloom(message["data"].decode().split())
+            except Exception:
+                logger.exception("Token denylist subscription failed")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _rebuild_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._rebuild_interval)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Failed to rebuild token denylist")
+
+    async def start(self) -> None:
+        """Load revocations from Redis, then keep the Bloom filter up to date."""
+        if self._tasks:
+            return
+        try:
+            await self.rebuild()
+        except RedisError:
+            logger.exception("Failed to load token denylist")
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._rebuild_periodically()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+token_denylist = TokenDenylist(
+    redis_client,
+    channel=settings.TOKEN_DENYLIST.CHANNEL,
+    bloom_capacity=settings.TOKEN_DENYLIST.BLOOM_CAPACITY,
+    bloom_error_rate=settings.TOKEN_DENYLIST.BLOOM_ERROR_RATE,
+    rebuild_interval=settings.TOKEN_DENYLIST.REBUILD_INTERVAL,
+)
@@ -7,14 +7,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.config import settings
 from src.core.database.models.user import User
 from src.core.repositories.user_repository import UserRepository
+from src.core.schemas.user_schemas import UserDTO
 from src.exceptions import (
     UserNotFoundException,
     InvalidTokenException,
     InvalidTokenTypeException,
 )
+from .user_cache import user_cache
 from ..utils.auth import encode_jwt, decode_jwt
 
 
+# User fields signed into access token when JWT_EMBED_USER_CLAIMS is on.
+USER_CLAIMS = ("email", "is_active", "is_staff", "is_superuser")
+
+
 class TokenType(enum.StrEnum):
     TYPE = "type"
     ACCESS = "access"
@@ -34,30 +40,58 @@ class TokenService:
         payload[TokenType.TYPE.value] = token_type.value
         return encode_jwt(payload, expire_minutes=expire_time_minutes)
 
-    def create_access_token(self, user: User) -> str:
-        jwt_payload = {"sub": str(user.id)}
+    def create_access_token(
+        self,
+        user: User | UserDTO,
+        device_id: uuid.UUID | None = None,
+        embed_user_claims: bool = settings.JWT.EMBED_USER_CLAIMS,
+    ) -> str:
+        # jti and sid (id of the device) allow to revoke the token before it expires.
+        jwt_payload = {"sub": str(user.id), "jti": str(uuid.uuid4())}
+        if device_id is not None:
+            jwt_payload["sid"] = str(device_id)
+        if embed_user_claims:
+            jwt_payload.update({claim: getattr(user, claim) for claim in USER_CLAIMS})
         return self._create_jwt_token(
             jwt_payload, TokenType.ACCESS, settings.JWT.ACCESS_TOKEN_LIFE
         )
 
-    def create_refresh_token(self, user: User) -> tuple[str, uuid.UUID]:
-        jti: uuid.UUID = uuid.uuid4()
-        jwt_payload = {"sub": str(user.id), "jti": str(jti)}
-        return (
-            self._create_jwt_token(
-                jwt_payload, TokenType.REFRESH, settings.JWT.REFRESH_TOKEN_LIFE
-            ),
-            jti,
+    def create_refresh_token(
+        self, user: User | UserDTO, device_id: uuid.UUID, jti: uuid.UUID
+    ) -> str:
+        # sid is id of the device, all refresh tokens of one login share it.
+        jwt_payload = {"sub": str(user.id), "jti": str(jti), "sid": str(device_id)}
+        return self._create_jwt_token(
+            jwt_payload, TokenType.REFRESH, settings.JWT.REFRESH_TOKEN_LIFE
         )
 
-    async def get_user_from_jwt(self, payload: dict) -> User:
-        """Get user from JWT via payload"""
-        user: User | None = await self._repository.get_user_by_field(id=payload["sub"])
+    async def get_user_from_jwt(self, payload: dict) -> UserDTO:
+        """Get user from JWT via payload. Reads user cache first, then the database."""
+        user_id = uuid.UUID(payload["sub"])
+        cached_user: UserDTO | None = await user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
 
+        user: User | None = await self._repository.get_user_by_field(id=user_id)
         if user is None:
             raise UserNotFoundException
 
-        return user
+        user_dto: UserDTO = UserDTO.model_validate(user)
+        await user_cache.set(user_dto)
+        return user_dto
+
+    @staticmethod
+    def get_user_from_claims(payload: dict) -> UserDTO | None:
+        """Build user from claims of access token. Return None if token has no claims"""
+        if not all(claim in payload for claim in USER_CLAIMS):
+            return None
+        return UserDTO(
+            id=payload["sub"],
+            email=payload["email"],
+            is_active=payload["is_active"],
+            is_staff=payload["is_staff"],
+            is_superuser=payload["is_superuser"],
+        )
 
     @staticmethod
     def get_current_token_payload(token: str) -> dict:
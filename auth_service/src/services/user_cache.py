@@ -0,0 +1,101 @@
+import json
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.core.redis.client import redis_client
+from src.core.schemas.user_schemas import UserDTO
+from src.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+IS_ACTIVE = 1
+IS_STAFF = 2
+IS_SUPERUSER = 4
+
+
+class UserCache:
+    """
+    Read-through cache of user snapshots. A small in-process cache with a short TTL
+    is in front of Redis. Call invalidate() after every change of the user.
+    If Redis is unavailable the cache is skipped and users are read from the database.
+    """
+
+    KEY_PREFIX = "user:"
+
+    def __init__(self, redis, ttl: int, local_ttl: float, local_maxsize: int):
+        self._redis = redis
+        self._ttl = ttl
+        self._local_ttl = local_ttl
+        self._local = TTLCache(local_maxsize, name="user")
+
+    @property
+    def local_hit_ratio(self) -> float:
+        return self._local.hit_ratio
+
+    def _key(self, user_id: uuid.UUID) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def dumps(user: UserDTO) -> bytes:
+        """Serialize user as [id, email, flags]."""
+        flags = (
+            IS_ACTIVE * user.is_active
+            | IS_STAFF * user.is_staff
+            | IS_SUPERUSER * user.is_superuser
+        )
+        return json.dumps(
+            [str(user.id), user.email, flags], separators=(",", ":")
+        ).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> UserDTO:
+        user_id, email, flags = json.loads(data)
+        return UserDTO(
+            id=user_id,
+            email=email,
+            is_active=bool(flags & IS_ACTIVE),
+            is_staff=bool(flags & IS_STAFF),
+            is_superuser=bool(flags & IS_SUPERUSER),
+        )
+
+    async def get(self, user_id: uuid.UUID) -> UserDTO | None:
+        user: UserDTO | None = self._local.get(user_id)
+        if user is not None:
+            return user
+
+        try:
+            data: bytes | None = await self._redis.get(self._key(user_id))
+        except RedisError:
+            logger.warning("Failed to get user %s from cache", user_id, exc_info=True)
+            return None
+
+        if data is None:
+            return None
+        user = self.loads(data)
+        self._local.set(user_id, user, self._local_ttl)
+        return user
+
+    async def set(self, user: UserDTO) -> None:
+        self._local.set(user.id, user, self._local_ttl)
+        try:
+            await self._redis.set(self._key(user.id), self.dumps(user), ex=self._ttl)
+        except RedisError:
+            logger.warning("Failed to cache user %s", user.id, exc_info=True)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        self._local.pop(user_id)
+        try:
+            await self._redis.delete(self._key(user_id))
+        except RedisError:
+            logger.error("Failed to invalidate cached user %s", user_id, exc_info=True)
+
+
+user_cache = UserCache(
+    redis_client,
+    ttl=settings.USER_CACHE.TTL,
+    local_ttl=settings.USER_CACHE.LOCAL_TTL,
+    local_maxsize=settings.USER_CACHE.LOCAL_MAXSIZE,
+)
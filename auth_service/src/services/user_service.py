@@ -1,9 +1,24 @@
+import uuid
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.database.models.user import User
 from src.core.repositories.user_repository import UserRepository
+from src.core.schemas.user_schemas import UserDTO
+from src.exceptions import UserNotFoundException
+from .user_cache import user_cache
 
 
 class UserService:
     def __init__(self, db_session: AsyncSession):
         self._session: AsyncSession = db_session
         self._repository = UserRepository(self._session)
+
+    async def update_user(self, user_id: uuid.UUID, **kwargs) -> UserDTO:
+        """Update user and drop the cached snapshot, so the change applies to next requests"""
+        user: User | None = await self._repository.update_user(user_id, **kwargs)
+        if user is None:
+            raise UserNotFoundException
+
+        await user_cache.invalidate(user_id)
+        return UserDTO.model_validate(user)
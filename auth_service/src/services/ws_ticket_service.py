@@ -0,0 +1,53 @@
+import json
+import logging
+import secrets
+import uuid
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.core.redis.client import redis_client
+from src.core.schemas.ws_ticket import SWSTicket, SWSTicketOwner
+from src.exceptions import InvalidWSTicketException, ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+
+class WSTicketService:
+    """
+    One-time tickets of WebSocket connections. A ticket is an opaque random string
+    stored in Redis for a few seconds with the user and the device it was issued to.
+    Redeem consumes the ticket by GETDEL, so it can be used only once.
+    Other services may redeem tickets directly with GETDEL ws_ticket:<ticket>.
+    """
+
+    KEY_PREFIX = "ws_ticket:"
+
+    def __init__(self, redis, ttl: int):
+        self._redis = redis
+        self._ttl = ttl
+
+    async def issue(self, user_id: uuid.UUID, device_id: uuid.UUID | None) -> SWSTicket:
+        ticket: str = secrets.token_urlsafe(32)
+        owner = SWSTicketOwner(user_id=user_id, device_id=device_id)
+        try:
+            await self._redis.set(
+                f"{self.KEY_PREFIX}{ticket}", owner.model_dump_json(), ex=self._ttl
+            )
+        except RedisError:
+            logger.exception("Failed to store ticket of user %s", user_id)
+            raise ServiceUnavailableException
+        return SWSTicket(ticket=ticket, expires_in=self._ttl)
+
+    async def redeem(self, ticket: str) -> SWSTicketOwner:
+        try:
+            data: bytes | None = await self._redis.getdel(f"{self.KEY_PREFIX}{ticket}")
+        except RedisError:
+            logger.exception("Failed to redeem ticket")
+            raise ServiceUnavailableException
+        if data is None:
+            raise InvalidWSTicketException
+        return SWSTicketOwner.model_validate(json.loads(data))
+
+
+ws_ticket_service = WSTicketService(redis_client, ttl=settings.WS_TICKET_TTL)
@@ -1,36 +1,126 @@
+import asyncio
+import functools
+import math
+import time
 from datetime import datetime, timezone, timedelta
+from typing import Mapping
 
 import bcrypt
 import jwt
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
 from user_agents.parsers import UserAgent
 
 from src.config import settings
 from user_agents import parse
 
+from .jwt_keys import jwt_key_manager
+from .metrics import JWT_DURATION, PASSWORD_HASHING_DURATION
+from .process_pool import BoundedProcessPool
+from .profiling import record_phase
+
+password_pool = BoundedProcessPool(
+    max_workers=settings.PASSWORD_HASHING.WORKERS,
+    max_pending=settings.PASSWORD_HASHING.MAX_PENDING,
+)
+# Separate from password_pool, so introspection batches and logins
+# don't take each other's MAX_PENDING budget.
+jwt_pool = BoundedProcessPool(
+    max_workers=settings.INTROSPECTION.WORKERS,
+    max_pending=settings.INTROSPECTION.MAX_PENDING,
+)
+
+JWT_ENCODE_DURATION = JWT_DURATION.labels("encode")
+JWT_DECODE_DURATION = JWT_DURATION.labels("decode")
+PASSWORD_HASH_DURATION = PASSWORD_HASHING_DURATION.labels("hash")
+PASSWORD_VERIFY_DURATION = PASSWORD_HASHING_DURATION.labels("verify")
+
 
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.JWT.PRIVATE_KEY,
-    algorithm: str = settings.JWT.ALGORITHM,
+    private_key: PrivateKeyTypes | str | None = None,
+    algorithm: str | None = None,
     expire_minutes: int = settings.JWT.ACCESS_TOKEN_LIFE,
+    headers: dict | None = None,
 ) -> str:
+    """
+    Encode payload. Uses the parsed key and algorithm of jwt_key_manager
+    if private_key is not given, then kid of the key is sent in the token header.
+    """
+    started_at: float = time.perf_counter()
+    if private_key is None:
+        private_key = jwt_key_manager.private_key
+        algorithm = jwt_key_manager.algorithm
+        headers = {"kid": jwt_key_manager.kid, **(headers or {})}
     to_encode = payload.copy()
     now = datetime.now(timezone.utc)
     expire = now + timedelta(minutes=expire_minutes)
     to_encode.update(exp=expire, iat=now)
-    encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
+    encoded = jwt.encode(to_encode, private_key, algorithm=algorithm, headers=headers)
+    duration: float = time.perf_counter() - started_at
+    JWT_ENCODE_DURATION.observe(duration)
+    record_phase("crypto", duration)
     return encoded
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.JWT.PUBLIC_KEY,
+    public_key: PublicKeyTypes | str | None = None,
     algorithm: str = settings.JWT.ALGORITHM,
 ) -> dict:
+    """
+    Decode token. If public_key is not given, the key of jwt_key_manager
+    is chosen by kid of the token header.
+    """
+    started_at: float = time.perf_counter()
+    if public_key is None:
+        kid: str | None = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            public_key = jwt_key_manager.public_key
+        elif kid in jwt_key_manager.verification_keys:
+            public_key, algorithm = jwt_key_manager.verification_keys[kid]
+        else:
+            raise jwt.InvalidTokenError(f"Unknown key id {kid!r}.")
     decoded = jwt.decode(token, public_key, algorithms=[algorithm])
+    duration: float = time.perf_counter() - started_at
+    JWT_DECODE_DURATION.observe(duration)
+    record_phase("crypto", duration)
     return decoded
 
 
+def decode_jwt_many(tokens: list[str]) -> list[dict | None]:
+    """Decode tokens, None for invalid or expired ones. Runs in the process pool."""
+    payloads: list[dict | None] = []
+    for token in tokens:
+        try:
+            payloads.append(decode_jwt(token))
+        except jwt.InvalidTokenError:
+            payloads.append(None)
+    return payloads
+
+
+async def decode_jwt_many_async(
+    tokens: list[str], inline_max: int, min_chunk_size: int, max_chunk_size: int
+) -> list[dict | None]:
+    """
+    Decode tokens in parallel in jwt_pool, chunks are spread evenly over its workers.
+    Only batches of up to inline_max tokens are decoded on the event loop.
+    """
+    if len(tokens) <= inline_max:
+        return decode_jwt_many(tokens)
+    chunk_size: int = min(
+        max(math.ceil(len(tokens) / jwt_pool.workers), min_chunk_size),
+        max_chunk_size,
+    )
+    chunks = [tokens[i : i + chunk_size] for i in range(0, len(tokens), chunk_size)]
+    results = await asyncio.gather(
+        *(jwt_pool.run(decode_jwt_many, chunk) for chunk in chunks)
+    )
+    return [payload for chunk in results for payload in chunk]
+
+
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     password_bytes: bytes = password.encode()
@@ -43,8 +133,39 @@ def validate_password(password: str, hashed_password: str) -> bool:
     )
 
 
-def get_user_agent(headers: dict) -> str:
+async def hash_password_async(password: str) -> str:
+    """Hash password in the password pool without blocking the event loop."""
+    started_at: float = time.perf_counter()
+    try:
+        return await password_pool.run(hash_password, password)
+    finally:
+        duration: float = time.perf_counter() - started_at
+        PASSWORD_HASH_DURATION.observe(duration)
+        record_phase("crypto", duration)
+
+
+async def validate_password_async(password: str, hashed_password: str) -> bool:
+    """Validate password in the password pool without blocking the event loop."""
+    started_at: float = time.perf_counter()
+    try:
+        return await password_pool.run(validate_password, password, hashed_password)
+    finally:
+        duration: float = time.perf_counter() - started_at
+        PASSWORD_VERIFY_DURATION.observe(duration)
+        record_phase("crypto", duration)
+
+
+@functools.lru_cache(maxsize=settings.USER_AGENT_CACHE_SIZE)
+def parse_user_agent(user_agent: str) -> str:
+    """
+    Return description of the device from User-Agent header. Parsing runs many regexes
+    while clients send few distinct headers, so results are cached. Hit rate: cache_info().
+    """
+    parsed_user_agent: UserAgent = parse(user_agent)
+    return str(parsed_user_agent)
+
+
+def get_user_agent(headers: Mapping[str, str]) -> str:
     if user_agent := headers.get("x-device-info"):
         return str(user_agent)
-    user_agent: UserAgent = parse(headers.get("user-agent"))
-    return str(user_agent)
+    return parse_user_agent(headers.get("user-agent", ""))
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from .metrics import CACHE_LOOKUPS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry has its own time to live.
+    Expired entries are dropped on access, least recently used ones when the cache is full.
+    Not thread safe, it is used from the event loop only.
+    Lookups of named caches are counted in the auth_cache_lookups metric.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        clock: Callable[[], float] = time.monotonic,
+        name: str | None = None,
+    ):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_LOOKUPS.labels(name, "hit") if name else None
+        self._miss_counter = CACHE_LOOKUPS.labels(name, "miss") if name else None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] > self._clock()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                if self._hit_counter is not None:
+                    self._hit_counter.inc()
+                return value
+            del self._data[key]
+
+        self.misses += 1
+        if self._miss_counter is not None:
+            self._miss_counter.inc()
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store value for ttl seconds. Does nothing if ttl is not positive or cache is disabled."""
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class _LoadCancelled(Exception):
+    """Set on the in-flight future when the call which loads the value is cancelled."""
+
+
+class AsyncCache:
+    """
+    Cache of async loader results. None results are cached for negative_ttl.
+    Concurrent calls for the same missing key wait for a single loader call.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, negative_ttl: float, name: str | None = None
+    ):
+        self._cache = TTLCache(maxsize, name=name)
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._cache.hit_ratio
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        while (in_flight := self._in_flight.get(key)) is not None:
+            try:
+                # shield() so a cancelled waiter doesn't cancel the load for the others.
+                return await asyncio.shield(in_flight)
+            except _LoadCancelled:
+                # The loading call was cancelled, a waiter takes over the load.
+                continue
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Not future.cancel(), waiters which weren't cancelled must not fail.
+            future.set_exception(_LoadCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved, there may be no waiters.
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(value)
+        self._cache.set(key, value, self._negative_ttl if value is None else self._ttl)
+        return value
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,165 @@
+"""
+Offline IP geolocation database.
+
+The CSV of ip ranges is converted once into a binary file:
+    header:  magic, number of ranges, offset of the string table
+    ranges:  sorted (start ip, end ip, location offset, location length) records,
+             ips are 16 bytes big-endian, IPv4 is stored as IPv4-mapped IPv6
+    strings: deduplicated UTF-8 locations
+The file is memory-mapped and every lookup is a binary search over the ranges.
+
+Build the database from the auth_service directory:
+    python -m src.utils.geoip ranges.csv geoip.bin --columns 2,3,4
+"""
+
+import argparse
+import csv
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GEOIPV1\0"
+HEADER = struct.Struct("<8sIQ")  # magic, number of ranges, strings offset
+RECORD = struct.Struct("<16s16sII")  # start, end, location offset, location length
+IPV4_MAPPED_PREFIX = b"\0" * 10 + b"\xff\xff"
+
+
+def pack_ip(ip: str | int) -> bytes:
+    """Return ip as 16 bytes big-endian. Accepts ip strings and integers."""
+    if isinstance(ip, str) and ip.isdigit():
+        ip = int(ip)
+    if isinstance(ip, int):
+        address = ipaddress.IPv4Address(ip) if ip < 2**32 else ipaddress.IPv6Address(ip)
+    else:
+        address = ipaddress.ip_address(ip)
+
+    if address.version == 4:
+        return IPV4_MAPPED_PREFIX + address.packed
+    return address.packed
+
+
+class GeoIPDatabase:
+    """Read-only memory-mapped ip ranges database built by build_database()."""
+
+    def __init__(self, path: str | os.PathLike):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count, self._strings_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a geoip database.")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _start(self, index: int) -> bytes:
+        offset = HEADER.size + index * RECORD.size
+        return self._mm[offset : offset + 16]
+
+    def lookup(self, ip: str) -> str | None:
+        """Return location of ip or None if ip is not in any range."""
+        try:
+            key: bytes = pack_ip(ip)
+        except ValueError:
+            return None
+
+        # Find the last range with start <= ip.
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._start(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+
+        _, end, location_offset, location_length = RECORD.unpack_from(
+            self._mm, HEADER.size + (low - 1) * RECORD.size
+        )
+        if key > end:
+            return None
+        start = self._strings_offset + location_offset
+        return self._mm[start : start + location_length].decode()
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def build_database(
+    ranges: Iterable[tuple[str, str, str]], path: str | os.PathLike
+) -> int:
+    """Write (start ip, end ip, location) ranges to path and return number of ranges."""
+    records: list[tuple[bytes, bytes, str]] = []
+    for start, end, location in ranges:
+        packed_start, packed_end = pack_ip(start), pack_ip(end)
+        if packed_start > packed_end:
+            raise ValueError(f"Invalid range {start} - {end}.")
+        records.append((packed_start, packed_end, location))
+    records.sort()
+
+    strings = bytearray()
+    string_offsets: dict[str, tuple[int, int]] = {}
+    packed_records = bytearray()
+    previous_end: bytes | None = None
+    for start, end, location in records:
+        if previous_end is not None and start <= previous_end:
+            raise ValueError(
+                f"Range starting at {ipaddress.ip_address(start)} overlaps."
+            )
+        previous_end = end
+
+        if location not in string_offsets:
+            encoded = location.encode()
+            string_offsets[location] = (len(strings), len(encoded))
+            strings += encoded
+        packed_records += RECORD.pack(start, end, *string_offsets[location])
+
+    # Write to a temporary file and replace, workers may have the old file mapped.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records), HEADER.size + len(packed_records)))
+        f.write(packed_records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def read_csv(
+    path: str | os.PathLike, columns: list[int], skip_header: bool
+) -> Iterable[tuple[str, str, str]]:
+    """Read rows "start ip, end ip, ..." and join the given columns into location."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            location = ", ".join(row[column] for column in columns if row[column])
+            yield row[0], row[1], location
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build offline geoip database.")
+    parser.add_argument("csv", help="CSV with rows: start ip, end ip, location fields")
+    parser.add_argument("output", help="Path of the binary database")
+    parser.add_argument(
+        "--columns",
+        default="2",
+        help="Comma separated indexes of columns joined into location. Default: 2",
+    )
+    parser.add_argument("--skip-header", action="store_true")
+    args = parser.parse_args()
+
+    columns = [int(column) for column in args.columns.split(",")]
+    count = build_database(read_csv(args.csv, columns, args.skip_header), args.output)
+    print(f"Written {count} ranges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
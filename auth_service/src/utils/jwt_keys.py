@@ -0,0 +1,149 @@
+import base64
+import functools
+import hashlib
+import json
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+from jwt.algorithms import RSAAlgorithm, ECAlgorithm, OKPAlgorithm
+
+from src.config import settings, JWTConfig
+
+# Algorithm -> key types which can be used with it.
+SUPPORTED_ALGORITHMS: dict[str, tuple[type, ...]] = {
+    "RS256": (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    "ES256": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    "EdDSA": (
+        ed25519.Ed25519PrivateKey,
+        ed25519.Ed25519PublicKey,
+        ed448.Ed448PrivateKey,
+        ed448.Ed448PublicKey,
+    ),
+}
+
+# JWK members used in the RFC 7638 thumbprint, which is used as kid.
+THUMBPRINT_MEMBERS: dict[str, tuple[str, ...]] = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def algorithm_for_key(key: PublicKeyTypes) -> str:
+    for algorithm, key_types in SUPPORTED_ALGORITHMS.items():
+        if isinstance(key, key_types):
+            return algorithm
+    raise ValueError(f"Unsupported key type {type(key).__name__}.")
+
+
+def public_key_to_jwk(key: PublicKeyTypes, algorithm: str) -> dict:
+    """Return public JWK of key with kid, alg and use members."""
+    if algorithm == "RS256":
+        jwk: dict = RSAAlgorithm.to_jwk(key, as_dict=True)
+    elif algorithm == "ES256":
+        jwk = ECAlgorithm.to_jwk(key, as_dict=True)
+    else:
+        jwk = OKPAlgorithm.to_jwk(key, as_dict=True)
+    thumbprint_input = json.dumps(
+        {member: jwk[member] for member in THUMBPRINT_MEMBERS[jwk["kty"]]},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    kid = base64.urlsafe_b64encode(hashlib.sha256(thumbprint_input.encode()).digest())
+    return {**jwk, "kid": kid.rstrip(b"=").decode(), "alg": algorithm, "use": "sig"}
+
+
+class JWTKeyManager:
+    """
+    Keeps parsed JWT keys. PyJWT accepts cryptography key objects and uses them as is,
+    so PEM strings are parsed once instead of on every encode or decode.
+    Tokens are signed by private_key, additional_public_keys only verify tokens,
+    e.g. keys being rotated out or in. All public keys are published as JWKS.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        public_key: str,
+        algorithm: str,
+        additional_public_keys: list[str] | None = None,
+    ):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported JWT algorithm {algorithm!r}. "
+                f"Use one of: {', '.join(SUPPORTED_ALGORITHMS)}"
+            )
+        self.algorithm = algorithm
+        self._private_key_pem = private_key
+        self._public_key_pem = public_key
+        self._additional_public_keys_pem = additional_public_keys or []
+
+    @classmethod
+    def from_config(cls, config: JWTConfig) -> "JWTKeyManager":
+        return cls(
+            config.PRIVATE_KEY,
+            config.PUBLIC_KEY,
+            config.ALGORITHM,
+            config.ADDITIONAL_PUBLIC_KEYS,
+        )
+
+    @functools.cached_property
+    def private_key(self) -> PrivateKeyTypes:
+        key = serialization.load_pem_private_key(
+            self._private_key_pem.encode(), password=None
+        )
+        self._check_key_type(key)
+        return key
+
+    @functools.cached_property
+    def public_key(self) -> PublicKeyTypes:
+        key = serialization.load_pem_public_key(self._public_key_pem.encode())
+        self._check_key_type(key)
+        return key
+
+    def _check_key_type(self, key: PrivateKeyTypes | PublicKeyTypes) -> None:
+        if not isinstance(key, SUPPORTED_ALGORITHMS[self.algorithm]):
+            raise ValueError(
+                f"Key of type {type(key).__name__} can't be used with {self.algorithm}."
+            )
+        if self.algorithm == "ES256" and key.curve.name != "secp256r1":
+            raise ValueError(f"ES256 requires a P-256 key, got {key.curve.name}.")
+
+    @functools.cached_property
+    def kid(self) -> str:
+        """Key id of the signing key, sent in headers of issued tokens."""
+        return public_key_to_jwk(self.public_key, self.algorithm)["kid"]
+
+    @functools.cached_property
+    def verification_keys(self) -> dict[str, tuple[PublicKeyTypes, str]]:
+        """kid -> (public key, algorithm) of all keys accepted in tokens."""
+        keys = {self.kid: (self.public_key, self.algorithm)}
+        for pem in self._additional_public_keys_pem:
+            key = serialization.load_pem_public_key(pem.encode())
+            algorithm = algorithm_for_key(key)
+            keys[public_key_to_jwk(key, algorithm)["kid"]] = (key, algorithm)
+        return keys
+
+    @functools.cached_property
+    def jwks(self) -> bytes:
+        """JSON of JWK Set with all verification keys."""
+        keys = [
+            public_key_to_jwk(key, algorithm)
+            for key, algorithm in self.verification_keys.values()
+        ]
+        return json.dumps({"keys": keys}, separators=(",", ":")).encode()
+
+    @functools.cached_property
+    def jwks_etag(self) -> str:
+        return f'"{hashlib.sha256(self.jwks).hexdigest()}"'
+
+    def load(self) -> None:
+        """Parse all keys now, so invalid keys are found at startup."""
+        _ = self.private_key, self.public_key, self.jwks
+
+
+jwt_key_manager = JWTKeyManager.from_config(settings.JWT)
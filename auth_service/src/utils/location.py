@@ -1,29 +1,115 @@
+import functools
 import logging
+import time
 
 import httpx
 from httpx import Response
 from src.config import settings
 
+from .cache import AsyncCache
+from .geoip import GeoIPDatabase
+from .metrics import GEOLOCATION_DURATION
+from .profiling import record_phase
+
 logger = logging.getLogger(__name__)
 
+GEOLOCATION_HTTP_DURATION = GEOLOCATION_DURATION.labels("http")
+
+
+class IPInfoProvider:
+    """
+    Location by ip from api.ipinfo.info. Uses one long-lived client, so connections
+    to the API are reused. The client is created in the app lifespan or on first use.
+    """
+
+    URL = "https://api.ipinfo.info/{ip}/"
+
+    def __init__(self, api_key: str):
+        self._api_key = api_key
+        self._client: httpx.AsyncClient | None = None
+
+    @staticmethod
+    def _create_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.GEOLOCATION.TIMEOUT,
+                connect=settings.GEOLOCATION.CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GEOLOCATION.MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GEOLOCATION.MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+
+    def start(self) -> None:
+        if self._client is None:
+            self._client = self._create_client()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_location(self, ip: str) -> str | None:
+        """Return location by ip or None if there is a problem with the service."""
+        self.start()
+        started_at: float = time.perf_counter()
+        try:
+            response: Response = await self._client.get(
+                self.URL.format(ip=ip),
+                params={"access_key": self._api_key, "output": "json"},
+            )
+            data: dict = response.json()
+            location = (
+                f"{data["continent_name"]}, {data["country_name"]}, {data["city"]}"
+            )
+            return location
+        except (httpx.RequestError, KeyError, ValueError):
+            logger.exception("Failed to get location for ip %s", ip)
+            return None
+        finally:
+            duration: float = time.perf_counter() - started_at
+            GEOLOCATION_HTTP_DURATION.observe(duration)
+            record_phase("http", duration)
+
+
+ip_info_provider = IPInfoProvider(settings.API_LOCATION_KEY)
+location_cache = AsyncCache(
+    maxsize=settings.GEOLOCATION.CACHE_SIZE,
+    ttl=settings.GEOLOCATION.CACHE_TTL,
+    negative_ttl=settings.GEOLOCATION.NEGATIVE_CACHE_TTL,
+    name="location",
+)
+
+
+@functools.cache
+def get_geoip_database() -> GeoIPDatabase | None:
+    """Return offline database if GEOLOCATION_DATABASE_PATH is set."""
+    if settings.GEOLOCATION.DATABASE_PATH is None:
+        return None
+    database = GeoIPDatabase(settings.GEOLOCATION.DATABASE_PATH)
+    logger.info("Loaded offline geoip database with %d ranges", len(database))
+    return database
+
 
 async def get_location_by_ip(ip: str) -> str | None:
     """
     Return location by ip. If no location exists or problem with connection to service, return None.
-    Change this function to work with other services.
+    The offline database is used first if it is configured, then the HTTP API.
+    HTTP results are cached by ip and concurrent lookups for the same ip make one request.
+    Change IPInfoProvider to work with other services.
     """
     if settings.USE_USER_GEOLOCATION:
-        try:
-            async with httpx.AsyncClient() as client:
-                response: Response = await client.get(
-                    f"https://api.ipinfo.info/{ip}/?access_key={settings.API_LOCATION_KEY}&output=json"
-                )
-                data: dict = response.json()
-                location = (
-                    f"{data["continent_name"]}, {data["country_name"]}, {data["city"]}"
-                )
+        geoip_database: GeoIPDatabase | None = get_geoip_database()
+        if geoip_database is not None:
+            with GEOLOCATION_DURATION.labels("database").time():
+                location: str | None = geoip_database.lookup(ip)
+            if location is not None:
                 return location
-        except (httpx.RequestError, KeyError):
-            logger.exception("Failed to get location for ip %s", ip)
-            return None
+            if not settings.GEOLOCATION.HTTP_FALLBACK:
+                return ""
+
+        return await location_cache.get_or_load(
+            ip, lambda: ip_info_provider.get_location(ip)
+        )
     return ""
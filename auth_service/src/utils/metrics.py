@@ -0,0 +1,187 @@
+# Loads .env before prometheus_client, which reads PROMETHEUS_MULTIPROC_DIR on import.
+import src.config  # noqa: F401
+
+import os
+import time
+
+from typing import TYPE_CHECKING, Iterable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from .sql_timing import listen_statements
+
+if TYPE_CHECKING:
+    from src.core.database.pool import PoolStats
+
+# With several uvicorn workers every process writes its samples to files in
+# PROMETHEUS_MULTIPROC_DIR and /metrics of any worker aggregates all of them.
+# The directory must be emptied before the workers start (see auth_start.sh).
+MULTIPROC_DIR: str | None = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Default buckets start at 5 ms, too coarse for signatures and most statements.
+FAST_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    float("inf"),
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "auth_http_request_duration_seconds",
+    "Duration of HTTP requests by route template.",
+    ["method", "route", "status"],
+)
+PASSWORD_HASHING_DURATION = Histogram(
+    "auth_password_hashing_duration_seconds",
+    "Duration of bcrypt hashing and verification, including wait for the pool.",
+    ["operation"],
+)
+JWT_DURATION = Histogram(
+    "auth_jwt_duration_seconds",
+    "Duration of JWT encoding and decoding.",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+GEOLOCATION_DURATION = Histogram(
+    "auth_geolocation_duration_seconds",
+    "Duration of location lookups by source.",
+    ["source"],
+    buckets=FAST_BUCKETS,
+)
+SQL_STATEMENT_DURATION = Histogram(
+    "auth_sql_statement_duration_seconds",
+    "Duration of SQL statements by the first keyword.",
+    ["statement"],
+    buckets=FAST_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "auth_cache_lookups",
+    "Lookups of in-process caches. Hit ratio: rate of hit / rate of all results.",
+    ["cache", "result"],
+)
+_request_durations: dict[tuple[str, str, int], Histogram] = {}
+_statement_durations: dict[str, Histogram] = {}
+
+
+def observe_request(method: str, route: str, status: int, duration: float) -> None:
+    # Children are cached, labels() converts and validates label values every call.
+    key = (method, route, status)
+    histogram = _request_durations.get(key)
+    if histogram is None:
+        histogram = HTTP_REQUEST_DURATION.labels(method, route, str(status))
+        _request_durations[key] = histogram
+    histogram.observe(duration)
+
+
+def statement_type(statement: str) -> str:
+    words: list[str] = statement[:16].split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _observe_statement(statement, parameters, context, executemany, duration):
+    kind: str = statement_type(statement)
+    histogram = _statement_durations.get(kind)
+    if histogram is None:
+        histogram = SQL_STATEMENT_DURATION.labels(kind)
+        _statement_durations[kind] = histogram
+    histogram.observe(duration)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Collect durations of SQL statements of the engine."""
+    listen_statements(engine, _observe_statement)
+
+
+class PoolCollector(Collector):
+    """
+    Pool metrics read on scrape from the pool and PoolStats of the engine.
+    In multiprocess mode every worker has its own pool, samples of the worker
+    which serves /metrics are labelled by its pid.
+    """
+
+    def __init__(self, engine: AsyncEngine, pool_stats: "PoolStats"):
+        self._engine = engine
+        self._pool_stats = pool_stats
+
+    def collect(self) -> Iterable[Metric]:
+        pool = self._engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        labels: dict[str, str] = (
+            {} if MULTIPROC_DIR is None else {"pid": str(os.getpid())}
+        )
+        gauges = {
+            "size": ("Configured size of the database pool.", pool.size()),
+            "checked_in": ("Idle database connections.", pool.checkedin()),
+            "checked_out": ("Database connections in use.", pool.checkedout()),
+            "overflow": ("Connections over the pool size.", pool.overflow()),
+        }
+        for name, (documentation, value) in gauges.items():
+            metric = GaugeMetricFamily(
+                f"auth_db_pool_{name}", documentation, labels=list(labels)
+            )
+            metric.add_metric(list(labels.values()), value)
+            yield metric
+        counters = {
+            "connects": "Connections opened by the pool.",
+            "checkouts": "Connections taken from the pool.",
+            "checkins": "Connections returned to the pool.",
+            "invalidations": "Connections invalidated after errors.",
+        }
+        for name, documentation in counters.items():
+            metric = CounterMetricFamily(
+                f"auth_db_pool_{name}", documentation, labels=list(labels)
+            )
+            metric.add_metric(list(labels.values()), getattr(self._pool_stats, name))
+            yield metric
+
+
+_pool_collector: PoolCollector | None = None
+
+
+def register_pool(engine: AsyncEngine, pool_stats: "PoolStats") -> None:
+    """Expose the pool of the engine, which is counted by pool_stats."""
+    global _pool_collector
+    _pool_collector = PoolCollector(engine, pool_stats)
+    if MULTIPROC_DIR is None:
+        REGISTRY.register(_pool_collector)
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    """Return exposition of all metrics and its content type."""
+    if MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if _pool_collector is not None:
+        registry.register(_pool_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop live gauges of this worker on shutdown in multiprocess mode."""
+    if MULTIPROC_DIR is not None:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from src.exceptions import ServiceBusyException
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU bound work (bcrypt, signatures) that must not block the event loop.
+    Number of jobs waiting for a worker is limited by max_pending, extra jobs are rejected
+    with ServiceBusyException instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int = 256):
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def workers(self) -> int:
+        return self._max_workers or os.cpu_count() or 1
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" because forking a process with running threads (asyncpg, logging) may deadlock.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in a worker process and wait for the result."""
+        if self._pending >= self._max_pending:
+            logger.warning("Process pool is full, %d jobs pending", self._pending)
+            raise ServiceBusyException
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # A worker died. Drop the pool, the next job will create a new one.
+            logger.exception("Process pool is broken, recreating it")
+            self.shutdown(wait=False)
+            raise
+        finally:
+            self._pending -= 1
+
+    def start(self) -> None:
+        self._get_executor()
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import functools
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .sql_timing import listen_statements
+
+
+class RequestTimings:
+    """Time spent by one request in phases: deps, db, crypto, http. In seconds."""
+
+    def __init__(self):
+        self.started_at: float = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.db_statements = 0
+
+    def add(self, phase: str, duration: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + duration
+
+    def server_timing(self) -> str:
+        """Value of Server-Timing header, durations in milliseconds."""
+        metrics: list[str] = []
+        for phase, duration in self.phases.items():
+            metric = f"{phase};dur={duration * 1000:.2f}"
+            if phase == "db":
+                metric += f';desc="{self.db_statements} statements"'
+            metrics.append(metric)
+        total: float = time.perf_counter() - self.started_at
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def log_fields(self) -> dict[str, Any]:
+        fields: dict[str, Any] = {
+            f"{phase}_ms": round(duration * 1000, 2)
+            for phase, duration in self.phases.items()
+        }
+        fields["db_statements"] = self.db_statements
+        return fields
+
+
+_current_timings: contextvars.ContextVar[RequestTimings | None] = (
+    contextvars.ContextVar("request_timings", default=None)
+)
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestTimings]:
+    """Collect timings of the code run inside, in the current context."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def record_phase(phase: str, duration: float) -> None:
+    """Add duration to the phase of the profiled request. Does nothing without one."""
+    timings: RequestTimings | None = _current_timings.get()
+    if timings is not None:
+        timings.add(phase, duration)
+
+
+def _observe_statement(statement, parameters, context, executemany, duration):
+    timings: RequestTimings | None = _current_timings.get()
+    if timings is not None:
+        timings.add("db", duration)
+        timings.db_statements += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Add time of SQL statements of the engine to the db phase."""
+    listen_statements(engine, _observe_statement)
+
+
+def _profiled_endpoint(endpoint: Callable) -> Callable:
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def call_endpoint(*args, **kwargs):
+        timings: RequestTimings | None = _current_timings.get()
+        if timings is not None:
+            # Includes db and crypto time of dependencies, like the user lookup.
+            timings.add("deps", time.perf_counter() - timings.started_at)
+        return await endpoint(*args, **kwargs)
+
+    return call_endpoint
+
+
+class ProfiledRoute(APIRoute):
+    """Route which records time until its endpoint is called as the deps phase."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+
+class StackSampler:
+    """
+    Statistical profiler. A thread samples the stack of the given thread every
+    interval and counts identical stacks. Samples of the event loop thread also
+    contain other requests handled at the same time.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _format(frame) -> str:
+        names: list[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_qualname} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._stacks[self._format(frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        """Write stacks in folded format of flamegraph.pl, also read by speedscope."""
+        with open(path, "w") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
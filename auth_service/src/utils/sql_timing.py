@@ -0,0 +1,42 @@
+import time
+import weakref
+from typing import Any, Callable
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# observer(statement, parameters, context, executemany, duration)
+StatementObserver = Callable[[str, Any, ExecutionContext, bool, float], None]
+
+_observers: weakref.WeakKeyDictionary[Engine, list[StatementObserver]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, *args):
+    context.statement_started_at = time.perf_counter()
+
+
+def listen_statements(engine: AsyncEngine, observer: StatementObserver) -> None:
+    """
+    Call observer with the duration of every statement of the engine. Statements
+    are timed once by one pair of cursor events for all observers (metrics,
+    request profiling, slow query log). Adding the same observer twice is a no-op.
+    """
+    sync_engine: Engine = engine.sync_engine
+    observers: list[StatementObserver] | None = _observers.get(sync_engine)
+    if observers is None:
+        observers = _observers[sync_engine] = []
+
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            duration: float = time.perf_counter() - context.statement_started_at
+            for observe in observers:
+                observe(statement, parameters, context, executemany, duration)
+
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    if observer not in observers:
+        observers.append(observer)
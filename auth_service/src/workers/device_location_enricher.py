@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.core.database.database import async_session_maker
+from src.core.repositories.device_repository import DeviceRepository
+from src.utils.location import get_location_by_ip
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceLocationEnricher:
+    """
+    Background worker which resolves locations of devices created with a pending location.
+    Pending devices are read and written in short transactions, the geolocation API
+    is called outside of them, so no row lock is held while it is waited for.
+    Several replicas can run it, a location is only written while it is pending.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        """Wake up the worker when a new device with pending location is created."""
+        self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """Resolve one batch of pending locations. Return number of updated devices."""
+        async with self._session_maker() as session:
+            pending: list[tuple[uuid.UUID, str]] = await DeviceRepository(
+                session
+            ).get_pending_locations(self._batch_size)
+        if not pending:
+            return 0
+
+        ips: list[str] = list({ip for _, ip in pending})
+        resolved = await asyncio.gather(*(get_location_by_ip(ip) for ip in ips))
+        # Failed lookups are stored as unknown location, so they aren't retried forever.
+        locations: dict[str, str] = {
+            ip: location or "" for ip, location in zip(ips, resolved)
+        }
+        async with self._session_maker() as session:
+            await DeviceRepository(session).set_locations(
+                [(device_id, locations[ip]) for device_id, ip in pending]
+            )
+        logger.debug("Resolved locations of %d devices", len(pending))
+        return len(pending)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed: int = await self.run_once()
+            except Exception:
+                logger.exception("Failed to resolve device locations")
+                processed = 0
+
+            if processed < self._batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+device_location_enricher = DeviceLocationEnricher(
+    async_session_maker,
+    batch_size=settings.GEOLOCATION.ENRICHMENT_BATCH_SIZE,
+    poll_interval=settings.GEOLOCATION.ENRICHMENT_POLL_INTERVAL,
+)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.core.database.database import async_session_maker
+from src.core.rabbitmq.client import publisher
+from src.core.rabbitmq.in_memory import InMemoryPublisher
+from src.core.rabbitmq.publisher import RabbitMQPublisher
+from src.core.repositories.outbox_repository import OutboxRepository
+from src.core.schemas.outbox import OutboxEventDTO
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Background worker which publishes outbox events to RabbitMQ in batches.
+    Events are locked with FOR UPDATE SKIP LOCKED, published with confirms and
+    deleted in the same transaction, so several replicas can run it and every event
+    is delivered at least once. Requests only insert events and never wait for the broker.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        publisher: RabbitMQPublisher | InMemoryPublisher,
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self._session_maker = session_maker
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        """Wake up the relay when new events are committed."""
+        self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """Publish one batch of events. Return number of published events."""
+        async with self._session_maker() as session:
+            repository = OutboxRepository(session)
+            events: list[OutboxEventDTO] = await repository.get_batch(self._batch_size)
+            if not events:
+                return 0
+            await self._publisher.publish_batch(events)
+            await repository.delete([event.id for event in events])
+        logger.debug("Published %d outbox events", len(events))
+        return len(events)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed: int = await self.run_once()
+            except Exception:
+                logger.exception("Failed to publish outbox events")
+                processed = 0
+
+            if processed < self._batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+outbox_relay = OutboxRelay(
+    async_session_maker,
+    publisher,
+    batch_size=settings.OUTBOX.BATCH_SIZE,
+    poll_interval=settings.OUTBOX.POLL_INTERVAL,
+)
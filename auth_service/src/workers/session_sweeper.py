@@ -0,0 +1,88 @@
+"""
+Background worker which deletes devices with expired refresh tokens.
+
+It runs inside the app (SESSION_SWEEPER_ENABLED) or once from the auth_service directory:
+    python -m src.workers.session_sweeper
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.core.database.database import async_session_maker
+from src.core.repositories.device_repository import DeviceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSweeper:
+    """
+    Deletes expired devices in batches with FOR UPDATE SKIP LOCKED,
+    so several replicas can run it at once and each DELETE is short.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        interval: float,
+    ):
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """Delete all expired devices batch by batch. Return number of deleted devices."""
+        now: datetime = datetime.now(timezone.utc)
+        deleted: int = 0
+        while True:
+            async with self._session_maker() as session:
+                batch: int = await DeviceRepository(session).delete_expired(
+                    now, self._batch_size
+                )
+            deleted += batch
+            if batch < self._batch_size:
+                break
+        logger.info("Deleted %d expired devices", deleted)
+        return deleted
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Failed to delete expired devices")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+session_sweeper = SessionSweeper(
+    async_session_maker,
+    batch_size=settings.SESSION_SWEEPER.BATCH_SIZE,
+    interval=settings.SESSION_SWEEPER.INTERVAL,
+)
+
+
+async def main() -> None:
+    deleted: int = await session_sweeper.run_once()
+    print(f"Deleted {deleted} expired devices")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,12 @@
 import logging
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
 
 import asyncpg
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
@@ -30,6 +32,30 @@ Base.metadata.bind = engine_test
 client = TestClient(app)
 
 
+@contextmanager
+def count_statements() -> Iterator[list[str]]:
+    """Collect SQL statements executed on the test engine, including commits."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        statements.append(statement.split(maxsplit=1)[0].upper())
+
+    def commit(conn) -> None:
+        statements.append("COMMIT")
+
+    event.listen(
+        engine_test.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    event.listen(engine_test.sync_engine, "commit", commit)
+    try:
+        yield statements
+    finally:
+        event.remove(
+            engine_test.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+        event.remove(engine_test.sync_engine, "commit", commit)
+
+
 async def create_database():
     conn = await asyncpg.connect(DB_URL)
     try:
@@ -85,6 +85,23 @@ class TestAuthService:
             assert data.get("refresh_token") is not None
             assert data.get("token_type") == "Bearer"
 
+    async def test_email_is_case_insensitive(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ):
+        user: SUserCreate = random_user[0]
+        other_case_email: str = user.email.upper()
+
+        response: Response = await ac.post(
+            "/auth/login/", json={"email": other_case_email, "password": user.password}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await ac.post(
+            "/auth/register/",
+            json={"email": other_case_email, "password": "1", "re_password": "1"},
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
     @pytest.mark.parametrize(
         "access_token, refresh_token, expected_status",
         [
@@ -173,6 +190,36 @@ class TestAuthService:
             )
             assert response.status_code == status.HTTP_200_OK
 
+    async def test_reused_refresh_token_revokes_device(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        """Refresh with a rotated token revokes all refresh tokens of the device."""
+        old_refresh_token: str = random_user[1].refresh_token
+        response: Response = await ac.post("/auth/refresh/", json=old_refresh_token)
+        assert response.status_code == status.HTTP_200_OK
+        new_refresh_token: str = response.json()["refresh_token"]
+
+        response = await ac.post("/auth/refresh/", json=old_refresh_token)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await ac.post("/auth/refresh/", json=new_refresh_token)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_refresh_from_other_device(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        """Refresh with other user agent revokes the device."""
+        refresh_token: str = random_user[1].refresh_token
+        response: Response = await ac.post(
+            "/auth/refresh/",
+            json=refresh_token,
+            headers={"X-Device-Info": "Other device"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await ac.post("/auth/refresh/", json=refresh_token)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     @pytest.mark.parametrize(
         "access_token, expected_status",
         [
@@ -244,12 +291,23 @@ class TestAuthService:
         assert response.status_code == expected_status
 
         if response.status_code == status.HTTP_200_OK:
+            # Access tokens of the logged out device are revoked.
             response: Response = await ac.get(
                 "/auth/devices/",
                 headers={"Authorization": f"Bearer {tokens.access_token}"},
             )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+            user: SUserCreate = random_user[0]
+            response = await ac.post(
+                "/auth/login/", json={"email": user.email, "password": user.password}
+            )
+            response = await ac.get(
+                "/auth/devices/",
+                headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+            )
             data: list = response.json()
-            assert len(data) == 0
+            assert device["id"] not in [device["id"] for device in data]
 
     async def test_logout_all_devices(
         self,
@@ -282,3 +340,8 @@ class TestAuthService:
         assert response.status_code == status.HTTP_200_OK
         data: list = response.json()
         assert data is None
+
+        response = await ac.get(
+            "/auth/devices/", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,98 @@
+from httpx import AsyncClient, Response
+from sqlalchemy import select, text, update
+from starlette import status
+
+from src.config import settings
+from src.core.database.models import Device
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.workers.device_location_enricher import DeviceLocationEnricher
+from tests.conftest import async_session_maker
+
+
+async def fake_get_location_by_ip(ip: str) -> str:
+    return "Europe, Belarus, Minsk"
+
+
+class TestDeviceLocation:
+    async def test_location_is_resolved_after_login(
+        self,
+        ac: AsyncClient,
+        random_user: tuple[SUserCreate, SToken],
+        monkeypatch,
+    ) -> None:
+        """Login doesn't wait for geolocation, the location is filled in later."""
+        monkeypatch.setattr(settings, "USE_USER_GEOLOCATION", True)
+        monkeypatch.setattr(
+            "src.workers.device_location_enricher.get_location_by_ip",
+            fake_get_location_by_ip,
+        )
+        user, tokens = random_user
+        headers = {"Authorization": f"Bearer {tokens.access_token}"}
+
+        response: Response = await ac.post(
+            "/auth/login/", json={"email": user.email, "password": user.password}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await ac.get("/auth/devices/", headers=headers)
+        pending = [device for device in response.json() if device["location_pending"]]
+        assert len(pending) == 1
+        assert pending[0]["location"] is None
+
+        enricher = DeviceLocationEnricher(
+            async_session_maker, batch_size=100, poll_interval=1
+        )
+        while await enricher.run_once():
+            pass
+
+        response = await ac.get("/auth/devices/", headers=headers)
+        devices = {device["id"]: device for device in response.json()}
+        assert not devices[pending[0]["id"]]["location_pending"]
+        assert devices[pending[0]["id"]]["location"] == "Europe, Belarus, Minsk"
+
+    async def test_devices_are_not_locked_during_lookup(
+        self,
+        ac: AsyncClient,
+        random_user: tuple[SUserCreate, SToken],
+        monkeypatch,
+    ) -> None:
+        """Devices can be changed while the location is looked up, changes are kept."""
+        monkeypatch.setattr(settings, "USE_USER_GEOLOCATION", True)
+        user, tokens = random_user
+        await ac.post(
+            "/auth/login/", json={"email": user.email, "password": user.password}
+        )
+        response: Response = await ac.get(
+            "/auth/devices/", headers={"Authorization": f"Bearer {tokens.access_token}"}
+        )
+        device_id: str = next(
+            device["id"] for device in response.json() if device["location_pending"]
+        )
+
+        async def get_location_by_ip(ip: str) -> str:
+            async with async_session_maker() as session:
+                # Fails instead of waiting, if the enricher locked the device.
+                await session.execute(text("SET LOCAL lock_timeout = '1s'"))
+                await session.execute(
+                    update(Device)
+                    .where(Device.id == device_id)
+                    .values(location="Set by other worker")
+                )
+                await session.commit()
+            return "Europe, Belarus, Minsk"
+
+        monkeypatch.setattr(
+            "src.workers.device_location_enricher.get_location_by_ip",
+            get_location_by_ip,
+        )
+        enricher = DeviceLocationEnricher(
+            async_session_maker, batch_size=100, poll_interval=1
+        )
+        await enricher.run_once()
+
+        async with async_session_maker() as session:
+            location: str = await session.scalar(
+                select(Device.location).where(Device.id == device_id)
+            )
+        assert location == "Set by other worker"
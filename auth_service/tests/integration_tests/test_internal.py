@@ -0,0 +1,67 @@
+from faker import Faker
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.config import settings
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.utils.auth import password_pool
+from tests.conftest import count_statements
+
+fake = Faker()
+
+
+class TestInternal:
+    async def test_get_db_pool_stats(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get(
+            "/internal/db/pool",
+            headers={"X-Internal-Api-Key": settings.INTERNAL_API_KEY},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["size"] == settings.DB.POOL_SIZE
+
+    async def test_get_db_pool_stats_without_key(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get("/internal/db/pool")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = await ac.get(
+            "/internal/db/pool", headers={"X-Internal-Api-Key": "wrong"}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_introspect(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken], monkeypatch
+    ) -> None:
+        """Tokens are verified in the process pool and users are read by one query."""
+        monkeypatch.setattr(settings.INTROSPECTION, "INLINE_MAX", 0)
+        monkeypatch.setattr(settings.INTROSPECTION, "MIN_CHUNK_SIZE", 1)
+        tokens: SToken = random_user[1]
+        response: Response = await ac.post(
+            "/auth/register/",
+            json={"email": fake.email(), "password": "1", "re_password": "1"},
+        )
+        other_tokens = SToken(**response.json())
+        request_tokens = [
+            tokens.access_token,
+            other_tokens.access_token,
+            "invalid_token",
+            tokens.refresh_token,
+        ]
+
+        # Introspection doesn't use the budget of the password hashing pool.
+        monkeypatch.setattr(password_pool, "_max_pending", 0)
+        with count_statements() as statements:
+            response = await ac.post(
+                "/internal/introspect",
+                json={"tokens": request_tokens},
+                headers={"X-Internal-Api-Key": settings.INTERNAL_API_KEY},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert statements == ["SELECT"]
+        results = response.json()
+        assert [result["active"] for result in results] == [True, True, False, False]
+        assert results[0]["user"]["email"] == random_user[0].email
+        assert results[0]["sid"] is not None
+        assert results[2]["error"] == "invalid_token"
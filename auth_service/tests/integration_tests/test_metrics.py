@@ -0,0 +1,110 @@
+from httpx import AsyncClient, Response
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette import status
+
+from src.config import settings
+from src.core.database.slow_query import SlowQueryLog
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.utils import profiling
+from src.utils.metrics import instrument_engine
+from tests.conftest import DB_URL_TEST
+
+
+INTERNAL_HEADERS = {"X-Internal-Api-Key": settings.INTERNAL_API_KEY}
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    async def test_request_duration_by_route_template(self, ac: AsyncClient) -> None:
+        await ac.get("/.well-known/jwks.json")
+        await ac.get("/no/such/route")
+
+        response: Response = await ac.get("/metrics", headers=INTERNAL_HEADERS)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert (
+            'auth_http_request_duration_seconds_count{method="GET",'
+            'route="/.well-known/jwks.json",status="200"}'
+        ) in response.text
+        assert (
+            'auth_http_request_duration_seconds_count{method="GET",'
+            'route="unmatched",status="404"}'
+        ) in response.text
+
+    async def test_metrics_require_internal_key(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get("/metrics")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_hot_path_durations(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        user, tokens = random_user
+        hashes: float = sample(
+            "auth_password_hashing_duration_seconds_count", operation="hash"
+        )
+        decodes: float = sample("auth_jwt_duration_seconds_count", operation="decode")
+        token_cache_hits: float = sample(
+            "auth_cache_lookups_total", cache="verified_token", result="hit"
+        )
+        headers = {"Authorization": f"Bearer {tokens.access_token}"}
+
+        await ac.post(
+            "/auth/register/",
+            json={"email": "a" + user.email, "password": "1", "re_password": "1"},
+        )
+        await ac.get("/users/me", headers=headers)
+        await ac.get("/users/me", headers=headers)
+
+        assert (
+            sample("auth_password_hashing_duration_seconds_count", operation="hash")
+            == hashes + 1
+        )
+        assert (
+            sample("auth_jwt_duration_seconds_count", operation="decode") == decodes + 1
+        )
+        assert (
+            sample("auth_cache_lookups_total", cache="verified_token", result="hit")
+            == token_cache_hits + 1
+        )
+
+    async def test_sql_statement_duration(self) -> None:
+        engine = create_async_engine(DB_URL_TEST, poolclass=NullPool)
+        instrument_engine(engine)
+        selects: float = sample(
+            "auth_sql_statement_duration_seconds_count", statement="SELECT"
+        )
+
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        await engine.dispose()
+
+        assert (
+            sample("auth_sql_statement_duration_seconds_count", statement="SELECT")
+            == selects + 1
+        )
+
+    async def test_statements_are_timed_once(self) -> None:
+        engine = create_async_engine(DB_URL_TEST, poolclass=NullPool)
+        instrument_engine(engine)
+        profiling.instrument_engine(engine)
+        SlowQueryLog(threshold=1).listen(engine)
+
+        dispatch = engine.sync_engine.dispatch
+        assert len(dispatch.before_cursor_execute) == 1
+        assert len(dispatch.after_cursor_execute) == 1
+        await engine.dispose()
+
+    async def test_pool_metrics(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get("/metrics", headers=INTERNAL_HEADERS)
+
+        assert f"auth_db_pool_size {float(settings.DB.POOL_SIZE)}" in response.text
+        assert "auth_db_pool_checked_out " in response.text
+        assert "auth_db_pool_checkouts_total " in response.text
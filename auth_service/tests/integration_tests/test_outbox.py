@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.core.rabbitmq.in_memory import InMemoryPublisher
+from src.core.schemas.outbox import AuthEvent
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.workers.outbox_relay import OutboxRelay
+from tests.conftest import async_session_maker
+
+
+async def publish_all(publisher: InMemoryPublisher) -> None:
+    relay = OutboxRelay(async_session_maker, publisher, batch_size=2, poll_interval=1)
+    while await relay.run_once():
+        pass
+
+
+class TestOutbox:
+    async def test_auth_events_are_published(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        user, tokens = random_user
+        response: Response = await ac.post(
+            "/auth/login/", json={"email": user.email, "password": user.password}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await ac.post(
+            "/auth/logout/",
+            json=tokens.refresh_token,
+            headers={"Authorization": f"Bearer {tokens.access_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        publisher = InMemoryPublisher()
+        await publish_all(publisher)
+
+        messages = [json.loads(body) for _, body in publisher.messages]
+        assert [message["id"] for message in messages] == sorted(
+            message["id"] for message in messages
+        )
+        user_id: str = next(
+            message["data"]["user_id"]
+            for message in messages
+            if message["data"].get("email") == user.email
+        )
+        assert [
+            message["type"]
+            for message in messages
+            if message["data"]["user_id"] == user_id
+        ] == [
+            AuthEvent.USER_REGISTERED,
+            AuthEvent.USER_LOGGED_IN,
+            AuthEvent.DEVICE_LOGGED_OUT,
+        ]
+
+    async def test_events_stay_in_outbox_if_broker_fails(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        publisher = InMemoryPublisher()
+        publisher.fail = True
+        relay = OutboxRelay(
+            async_session_maker, publisher, batch_size=10, poll_interval=1
+        )
+        with pytest.raises(ConnectionError):
+            await relay.run_once()
+
+        publisher.fail = False
+        await publish_all(publisher)
+        assert publisher.messages
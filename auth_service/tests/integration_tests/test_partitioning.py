@@ -0,0 +1,147 @@
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.core.database.models import Device, User
+from src.core.database.models.base import Base
+from src.core.database.partitioning import DevicePartitioner
+from src.core.repositories.device_repository import DeviceRepository
+from src.core.schemas.device import SDeviceCreate
+from tests.conftest import DB_URL
+
+DB_NAME = "test_partitioning"
+
+
+@pytest.fixture()
+async def engine():
+    conn = await asyncpg.connect(DB_URL)
+    await conn.execute(f"DROP DATABASE IF EXISTS {DB_NAME}")
+    await conn.execute(f"CREATE DATABASE {DB_NAME}")
+    engine = create_async_engine(
+        f"{DB_URL.replace('postgresql', 'postgresql+asyncpg', 1)}/{DB_NAME}",
+        poolclass=NullPool,
+    )
+    async with engine.begin() as db_conn:
+        await db_conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    await engine.dispose()
+    await conn.execute(f"DROP DATABASE IF EXISTS {DB_NAME}")
+    await conn.close()
+
+
+def device(user_id: uuid.UUID) -> SDeviceCreate:
+    return SDeviceCreate(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        user_agent="Chrome 129 on Linux",
+        ip="10.0.0.1",
+        jti=uuid.uuid4(),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=30),
+    )
+
+
+class TestDevicePartitioner:
+    async def test_device_table_is_partitioned_online(self, engine) -> None:
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        user_ids: list[uuid.UUID] = [uuid.uuid4() for _ in range(8)]
+        async with session_maker() as session:
+            await session.execute(
+                insert(User),
+                [
+                    {
+                        "id": user_id,
+                        "email": f"user{i}@example.com",
+                        "password": "hash",
+                        "is_active": True,
+                        "is_superuser": False,
+                        "is_staff": False,
+                    }
+                    for i, user_id in enumerate(user_ids)
+                ],
+            )
+            await session.commit()
+            repository = DeviceRepository(session)
+            devices = [
+                await repository.create(device(user_id))
+                for user_id in user_ids
+                for _ in range(3)
+            ]
+
+        partitioner = DevicePartitioner(engine, partitions=4, batch_size=5)
+        await partitioner.prepare()
+        # Devices are changed between batches, the trigger mirrors the changes.
+        last_id, count = await partitioner.copy_batch(uuid.UUID(int=0))
+        assert count == 5
+        async with session_maker() as session:
+            repository = DeviceRepository(session)
+            created = await repository.create(device(user_ids[0]))
+            await repository.delete_by_user_id_and_jti(
+                devices[0].user_id, devices[0].jti
+            )
+            await repository.update(devices[1].user_id, devices[1].jti, ip="10.0.0.2")
+            await repository.set_locations([(devices[2].id, "Europe")])
+        assert await partitioner.copy() == len(devices)
+        await partitioner.swap()
+        assert await partitioner.is_partitioned()
+
+        async with session_maker() as session:
+            repository = DeviceRepository(session)
+            assert (await repository.get(created.user_id, created.jti)).id == created.id
+            with pytest.raises(ValueError):
+                await repository.get(devices[0].user_id, devices[0].jti)
+            assert (await repository.get(devices[1].user_id, devices[1].jti)).ip == (
+                "10.0.0.2"
+            )
+            assert (
+                await repository.get(devices[2].user_id, devices[2].jti)
+            ).location == "Europe"
+            assert len(await repository.get_user_devices(user_ids[0])) == 3
+            assert len(await repository.get_user_devices(user_ids[1])) == 3
+
+            # Lookups of the hot path scan a single partition.
+            plan: str = "\n".join(
+                (
+                    await session.execute(
+                        text(
+                            "EXPLAIN SELECT * FROM device "
+                            "WHERE user_id = :user_id AND jti = :jti"
+                        ),
+                        {"user_id": devices[3].user_id, "jti": devices[3].jti},
+                    )
+                ).scalars()
+            )
+            assert len(set(re.findall(r" on (device_p\d+)", plan))) == 1
+            ids = (await session.execute(select(Device.id))).scalars().all()
+            assert len(ids) == len(devices)
+
+        await partitioner.run(drop_old=True)
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT to_regclass('device_old')")) is None
+
+    async def test_swap_gives_up_if_device_is_locked(self, engine) -> None:
+        partitioner = DevicePartitioner(engine, partitions=4, batch_size=5)
+        await partitioner.prepare()
+
+        async with engine.connect() as conn:
+            # Long transaction, which read devices.
+            await conn.execute(select(Device.id))
+            started_at: float = time.perf_counter()
+            with pytest.raises(DBAPIError):
+                await partitioner.swap(lock_timeout=0.1, attempts=2)
+            assert time.perf_counter() - started_at < 1
+            await conn.rollback()
+
+        assert not await partitioner.is_partitioned()
+        await partitioner.swap(lock_timeout=0.1, attempts=2)
+        assert await partitioner.is_partitioned()
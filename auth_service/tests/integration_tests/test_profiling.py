@@ -0,0 +1,77 @@
+import logging
+import re
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+from faker import Faker
+from httpx import ASGITransport, AsyncClient, Response
+from starlette import status
+
+from src.main import app
+from src.middlewares.profiling import ProfilingMiddleware
+from src.utils import profiling
+from tests.conftest import engine_test
+
+fake = Faker()
+
+
+@pytest.fixture()
+async def profiled_ac(tmp_path: Path) -> AsyncGenerator[AsyncClient, None]:
+    profiling.instrument_engine(engine_test)
+    middleware = ProfilingMiddleware(
+        app, sample_rate=1, sample_interval=0.001, output_dir=str(tmp_path)
+    )
+    async with AsyncClient(
+        transport=ASGITransport(middleware), base_url="http://testserver"
+    ) as ac:
+        yield ac
+
+
+def server_timing(response: Response) -> dict[str, str]:
+    return {
+        metric.split(";", 1)[0]: metric
+        for metric in response.headers["Server-Timing"].split(", ")
+    }
+
+
+class TestProfiling:
+    async def test_register_phases(
+        self, profiled_ac: AsyncClient, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        caplog.set_level(logging.INFO, logger="src.middlewares.profiling")
+        response: Response = await profiled_ac.post(
+            "/auth/register/",
+            json={"email": fake.email(), "password": "1", "re_password": "1"},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        metrics: dict[str, str] = server_timing(response)
+        assert {"deps", "db", "crypto", "total"} <= metrics.keys()
+        assert 'desc="4 statements"' in metrics["db"]
+
+        record = next(r for r in caplog.records if r.msg == "Request profiled")
+        assert record.route == "/auth/register/"
+        assert record.status == status.HTTP_201_CREATED
+        assert record.db_statements == 4
+        assert record.crypto_ms > 0
+
+    async def test_sampled_request_writes_folded_stacks(
+        self, profiled_ac: AsyncClient, tmp_path: Path
+    ) -> None:
+        await profiled_ac.post(
+            "/auth/register/",
+            json={"email": fake.email(), "password": "1", "re_password": "1"},
+        )
+
+        [profile] = tmp_path.glob("*-POST-auth_register.folded")
+        lines: list[str] = profile.read_text().splitlines()
+        assert lines
+        assert all(re.fullmatch(r".+ \d+", line) for line in lines)
+
+    async def test_timings_are_not_collected_outside_of_request(
+        self, profiled_ac: AsyncClient
+    ) -> None:
+        await profiled_ac.get("/.well-known/jwks.json")
+
+        assert profiling._current_timings.get() is None
@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock
+
+from faker import Faker
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.config import settings
+from tests.conftest import count_statements
+
+fake = Faker()
+
+
+class TestRateLimit:
+    async def test_login_is_rejected_before_hashing_and_sql(
+        self, ac: AsyncClient, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(settings.RATE_LIMIT, "LOGIN_PER_EMAIL", 2)
+        validate_password = AsyncMock(return_value=False)
+        monkeypatch.setattr(
+            "src.services.auth_service.validate_password_async", validate_password
+        )
+        data = {"email": fake.email(), "password": "1"}
+        for _ in range(2):
+            response: Response = await ac.post("/auth/login/", json=data)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        with count_statements() as statements:
+            response = await ac.post("/auth/login/", json=data)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert (
+            0 < int(response.headers["Retry-After"]) <= settings.RATE_LIMIT.LOGIN_WINDOW
+        )
+        assert statements == []
+        validate_password.assert_not_called()
+
+    async def test_register_is_limited_by_ip(
+        self, ac: AsyncClient, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(settings.RATE_LIMIT, "REGISTER_PER_IP", 0)
+
+        response: Response = await ac.post(
+            "/auth/register/",
+            json={"email": fake.email(), "password": "1", "re_password": "1"},
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Retry-After" in response.headers
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient, Response
+from sqlalchemy import update
+from starlette import status
+
+from src.core.database.models import Device
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.workers.session_sweeper import SessionSweeper
+from tests.conftest import async_session_maker
+
+
+class TestSessionSweeper:
+    async def test_expired_devices_are_deleted(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        user, tokens = random_user
+        headers = {"Authorization": f"Bearer {tokens.access_token}"}
+        for _ in range(2):
+            response: Response = await ac.post(
+                "/auth/login/", json={"email": user.email, "password": user.password}
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = await ac.get("/auth/devices/", headers=headers)
+        device_ids = [device["id"] for device in response.json()]
+        assert len(device_ids) == 3
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Device)
+                .where(Device.id.in_(device_ids))
+                .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+            )
+            await session.commit()
+
+        sweeper = SessionSweeper(async_session_maker, batch_size=2, interval=1)
+        assert await sweeper.run_once() == 3
+
+        response = await ac.get("/auth/devices/", headers=headers)
+        assert response.json() == []
+        response = await ac.post("/auth/refresh/", json=tokens.refresh_token)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
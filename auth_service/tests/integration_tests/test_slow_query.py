@@ -0,0 +1,115 @@
+import logging
+from typing import AsyncGenerator
+
+import pytest
+from httpx import AsyncClient, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette import status
+
+from src.config import settings
+from src.core.database.slow_query import SlowQueryLog
+from src.core.repositories.user_repository import UserRepository
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from tests.conftest import DB_URL_TEST
+
+
+@pytest.fixture()
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    engine = create_async_engine(DB_URL_TEST, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+class TestSlowQueryLog:
+    async def test_slow_statement_is_logged_with_caller(
+        self,
+        engine: AsyncEngine,
+        random_user: tuple[SUserCreate, SToken],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        slow_query_log = SlowQueryLog(threshold=0)
+        slow_query_log.listen(engine)
+
+        async with AsyncSession(engine) as session:
+            for _ in range(2):
+                await UserRepository(session).get_user_by_field(
+                    email=random_user[0].email
+                )
+
+        [query] = slow_query_log.report()
+        assert query.calls == 2
+        assert query.parameters == "(str)"
+        [caller] = query.callers
+        assert caller.startswith("UserRepository.get_user_by_field (src/core/")
+        record = next(r for r in caplog.records if r.msg == "Slow query")
+        assert record.sql == query.statement
+        assert record.caller == caller
+        assert random_user[0].email not in caplog.text
+
+    async def test_fast_statement_is_not_logged(self, engine: AsyncEngine) -> None:
+        slow_query_log = SlowQueryLog(threshold=0.05)
+        slow_query_log.listen(engine)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT pg_sleep(0.1)"))
+
+        [query] = slow_query_log.report()
+        assert "pg_sleep" in query.statement
+
+    async def test_explain_once_per_fingerprint(
+        self, engine: AsyncEngine, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        caplog.set_level(logging.INFO, logger="src.core.database.slow_query")
+        slow_query_log = SlowQueryLog(threshold=0, explain=True)
+        slow_query_log.listen(engine)
+
+        async with engine.connect() as conn:
+            for limit in (1, 2):
+                await conn.execute(
+                    text(f'SELECT id FROM "user" WHERE email = :email LIMIT {limit}'),
+                    {"email": "nobody@example.com"},
+                )
+
+        assert await slow_query_log.run_once() == 1
+        [query] = slow_query_log.report()
+        assert query.calls == 2
+        assert "actual time" in query.plan
+        assert not any(
+            "EXPLAIN" in getattr(r, "sql", "") for r in caplog.records
+        ), "EXPLAIN must not be logged as a slow query"
+
+    async def test_dml_is_explained_without_execution(
+        self, engine: AsyncEngine
+    ) -> None:
+        slow_query_log = SlowQueryLog(threshold=0, explain=True)
+        slow_query_log.listen(engine)
+        insert = text(
+            "INSERT INTO outbox_event (event_type, payload, created_at, updated_at) "
+            "VALUES (:event_type, '{}', now(), now()) RETURNING id"
+        )
+
+        async with engine.connect() as conn:
+            event_id: int = await conn.scalar(insert, {"event_type": "test"})
+            await conn.rollback()
+        assert await slow_query_log.run_once() == 1
+
+        [query] = slow_query_log.report()
+        assert "Insert on public.outbox_event" in query.plan
+        assert "actual time" not in query.plan
+        async with engine.connect() as conn:
+            # Sequence isn't rolled back, it would be advanced by EXPLAIN ANALYZE.
+            assert await conn.scalar(insert, {"event_type": "test"}) == event_id + 1
+            await conn.rollback()
+
+    async def test_get_slow_queries(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get(
+            "/internal/db/slow-queries",
+            headers={"X-Internal-Api-Key": settings.INTERNAL_API_KEY},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert isinstance(response.json(), list)
@@ -0,0 +1,79 @@
+from faker import Faker
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from tests.conftest import count_statements
+
+fake = Faker()
+
+
+class TestStatementCount:
+    """
+    Number of round trips to the database on every auth path.
+    INSERT before COMMIT of login, register and logout is the outbox event.
+    """
+
+    async def test_register(self, ac: AsyncClient) -> None:
+        data = {"email": fake.email(), "password": "1", "re_password": "1"}
+        with count_statements() as statements:
+            response: Response = await ac.post("/auth/register/", json=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert statements == ["SELECT", "INSERT", "INSERT", "INSERT", "COMMIT"]
+
+    async def test_register_duplicate(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        email = random_user[0].email
+        data = {"email": email, "password": "1", "re_password": "1"}
+        with count_statements() as statements:
+            response: Response = await ac.post("/auth/register/", json=data)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert statements == ["SELECT"]
+
+    async def test_login(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        user = random_user[0]
+        data = {"email": user.email, "password": user.password}
+        with count_statements() as statements:
+            response: Response = await ac.post("/auth/login/", json=data)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert statements == ["SELECT", "INSERT", "INSERT", "COMMIT"]
+
+    async def test_refresh(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        tokens = random_user[1]
+        # Warm up the user cache, so only the refresh itself is counted.
+        await ac.get(
+            "/users/me", headers={"Authorization": f"Bearer {tokens.access_token}"}
+        )
+        with count_statements() as statements:
+            response: Response = await ac.post(
+                "/auth/refresh/", json=tokens.refresh_token
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert statements == ["UPDATE", "COMMIT"]
+
+    async def test_logout(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        tokens = random_user[1]
+        await ac.get(
+            "/users/me", headers={"Authorization": f"Bearer {tokens.access_token}"}
+        )
+        with count_statements() as statements:
+            response: Response = await ac.post(
+                "/auth/logout/",
+                json=tokens.refresh_token,
+                headers={"Authorization": f"Bearer {tokens.access_token}"},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert statements == ["INSERT", "DELETE", "COMMIT"]
@@ -0,0 +1,71 @@
+import uuid
+
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate, UserDTO
+from src.core.repositories.user_repository import UserRepository
+from src.services.token_service import TokenService
+from src.services.user_service import UserService
+from tests.conftest import async_session_maker
+
+
+class TestUsers:
+    async def test_get_my_user_info(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        user, tokens = random_user
+
+        response: Response = await ac.get(
+            "/users/me", headers={"Authorization": f"Bearer {tokens.access_token}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json().get("email") == user.email
+
+    async def test_changed_user_is_not_served_from_cache(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        """After the user is deactivated the cached active user must not be used."""
+        headers = {"Authorization": f"Bearer {random_user[1].access_token}"}
+        response: Response = await ac.get("/users/me", headers=headers)
+        user_id = uuid.UUID(response.json()["id"])
+
+        async with async_session_maker() as session:
+            await UserService(session).update_user(user_id, is_active=False)
+
+        response = await ac.get("/users/me", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_get_my_user_info_from_token_claims(self, ac: AsyncClient) -> None:
+        """User with claims in the token is not read from the database."""
+        user = UserDTO(
+            id=uuid.uuid4(),
+            email="not_in_database@example.com",
+            is_active=True,
+            is_staff=False,
+            is_superuser=False,
+        )
+        async with async_session_maker() as session:
+            access_token = TokenService(session).create_access_token(
+                user, embed_user_claims=True
+            )
+
+        response: Response = await ac.get(
+            "/users/me", headers={"Authorization": f"Bearer {access_token}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"id": str(user.id), "email": user.email}
+
+    async def test_insert_if_absent_skips_taken_email(self) -> None:
+        user = SUserCreate(email=f"{uuid.uuid4().hex}@example.com", password="1")
+        async with async_session_maker() as session:
+            created = await UserRepository(session).insert_if_absent(user)
+            await session.commit()
+        async with async_session_maker() as session:
+            duplicate = await UserRepository(session).insert_if_absent(user)
+
+        assert created is not None and created.email == user.email
+        assert duplicate is None
@@ -0,0 +1,33 @@
+import jwt
+from httpx import AsyncClient, Response
+from starlette import status
+
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+
+
+class TestWellKnown:
+    async def test_jwks_verifies_access_token(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        access_token: str = random_user[1].access_token
+        response: Response = await ac.get("/.well-known/jwks.json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "max-age" in response.headers["Cache-Control"]
+        kid: str = jwt.get_unverified_header(access_token)["kid"]
+        jwk = next(key for key in response.json()["keys"] if key["kid"] == kid)
+        public_key = jwt.PyJWK(jwk).key
+        payload = jwt.decode(access_token, public_key, algorithms=[jwk["alg"]])
+        assert payload["type"] == "access"
+
+    async def test_jwks_not_modified(self, ac: AsyncClient) -> None:
+        response: Response = await ac.get("/.well-known/jwks.json")
+
+        response = await ac.get(
+            "/.well-known/jwks.json",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
@@ -0,0 +1,59 @@
+from unittest.mock import AsyncMock
+
+from httpx import AsyncClient, Response
+from redis.exceptions import ConnectionError
+from starlette import status
+
+from src.config import settings
+from src.core.schemas.token import SToken
+from src.core.schemas.user_schemas import SUserCreate
+from src.exceptions import ServiceUnavailableException
+from src.services.ws_ticket_service import ws_ticket_service
+
+
+class TestWSTicket:
+    async def test_ticket_is_redeemed_once(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken]
+    ) -> None:
+        access_token: str = random_user[1].access_token
+        response: Response = await ac.post(
+            "/auth/ws-ticket/", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        ticket: str = response.json()["ticket"]
+        assert response.json()["expires_in"] == settings.WS_TICKET_TTL
+
+        headers = {"X-Internal-Api-Key": settings.INTERNAL_API_KEY}
+        response = await ac.post(
+            "/internal/ws-ticket/redeem", json={"ticket": ticket}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        me: Response = await ac.get(
+            "/users/me", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert response.json()["user_id"] == me.json()["id"]
+        assert response.json()["device_id"] is not None
+
+        response = await ac.post(
+            "/internal/ws-ticket/redeem", json={"ticket": ticket}, headers=headers
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_ticket_requires_access_token(self, ac: AsyncClient) -> None:
+        response: Response = await ac.post("/auth/ws-ticket/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_redis_failure_is_reported_as_unavailable(
+        self, ac: AsyncClient, random_user: tuple[SUserCreate, SToken], monkeypatch
+    ) -> None:
+        monkeypatch.setattr(
+            ws_ticket_service,
+            "_redis",
+            AsyncMock(**{"set.side_effect": ConnectionError}),
+        )
+        response: Response = await ac.post(
+            "/auth/ws-ticket/",
+            headers={"Authorization": f"Bearer {random_user[1].access_token}"},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["detail"] == ServiceUnavailableException().detail
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.token_cache import VerifiedTokenCache
+from src.utils.cache import AsyncCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    def test_entry_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, clock=clock)
+        cache.set("key", "value", ttl=5)
+
+        clock.now = 4.9
+        assert cache.get("key") == "value"
+
+        clock.now = 5
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache(maxsize=10)
+        cache.set("key", "value", ttl=60)
+
+        cache.get("key")
+        cache.get("key")
+        cache.get("missing")
+
+        assert cache.hits == 2
+        assert cache.misses == 1
+        assert cache.hit_ratio == 2 / 3
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = TTLCache(maxsize=0)
+        cache.set("key", "value", ttl=60)
+
+        assert cache.get("key") is None
+
+
+class TestVerifiedTokenCache:
+    def test_payload_is_cached_until_token_expires(self):
+        cache = VerifiedTokenCache(maxsize=10)
+        payload = {"sub": "user", "exp": time.time() + 60}
+        cache.add("token", payload)
+
+        assert cache.get("token") == payload
+        assert cache.get("other_token") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_token_is_not_cached(self):
+        cache = VerifiedTokenCache(maxsize=10)
+        cache.add("token", {"sub": "user", "exp": time.time() - 1})
+
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+
+class TestAsyncCache:
+    async def test_concurrent_loads_are_coalesced(self):
+        cache = AsyncCache(maxsize=10, ttl=60, negative_ttl=5)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "Europe, Belarus, Minsk"
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("1.1.1.1", loader) for _ in range(10))
+        )
+
+        assert calls == 1
+        assert set(results) == {"Europe, Belarus, Minsk"}
+        assert await cache.get_or_load("1.1.1.1", loader) == "Europe, Belarus, Minsk"
+        assert calls == 1
+
+    async def test_waiters_load_if_loading_call_is_cancelled(self):
+        cache = AsyncCache(maxsize=10, ttl=60, negative_ttl=5)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "Europe, Belarus, Minsk"
+
+        leader = asyncio.create_task(cache.get_or_load("1.1.1.1", loader))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(cache.get_or_load("1.1.1.1", loader)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == ["Europe, Belarus, Minsk"] * 3
+        assert leader.cancelled()
+        assert calls == 2
+
+    async def test_none_is_cached(self):
+        cache = AsyncCache(maxsize=10, ttl=60, negative_ttl=5)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            return None
+
+        assert await cache.get_or_load("1.1.1.1", loader) is None
+        assert await cache.get_or_load("1.1.1.1", loader) is None
+        assert calls == 1
+
+    async def test_errors_are_not_cached(self):
+        cache = AsyncCache(maxsize=10, ttl=60, negative_ttl=5)
+
+        async def failing_loader():
+            raise ValueError
+
+        async def loader():
+            return "location"
+
+        with pytest.raises(ValueError):
+            await cache.get_or_load("1.1.1.1", failing_loader)
+        assert await cache.get_or_load("1.1.1.1", loader) == "location"
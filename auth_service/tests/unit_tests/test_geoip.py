@@ -0,0 +1,67 @@
+import pytest
+
+from src.utils.geoip import GeoIPDatabase, build_database, read_csv
+
+CSV = """start,end,continent,country,city
+1.0.0.0,1.0.0.255,Oceania,Australia,Sydney
+16777472,16778239,Asia,China,Fuzhou
+37.45.0.0,37.45.255.255,Europe,Belarus,Minsk
+2a00:1450::,2a00:1450:ffff:ffff:ffff:ffff:ffff:ffff,Europe,Ireland,Dublin
+"""
+
+
+@pytest.fixture()
+def database(tmp_path) -> GeoIPDatabase:
+    csv_path = tmp_path / "ranges.csv"
+    csv_path.write_text(CSV)
+    database_path = tmp_path / "geoip.bin"
+    build_database(read_csv(csv_path, [2, 3, 4], skip_header=True), database_path)
+
+    database = GeoIPDatabase(database_path)
+    yield database
+    database.close()
+
+
+class TestGeoIPDatabase:
+    @pytest.mark.parametrize(
+        "ip, location",
+        [
+            ("1.0.0.0", "Oceania, Australia, Sydney"),
+            ("1.0.0.255", "Oceania, Australia, Sydney"),
+            ("1.0.1.17", "Asia, China, Fuzhou"),
+            ("37.45.120.1", "Europe, Belarus, Minsk"),
+            ("2a00:1450:4001::1", "Europe, Ireland, Dublin"),
+            ("0.255.255.255", None),
+            ("1.0.4.0", None),
+            ("127.0.0.1", None),
+            ("::1", None),
+            ("not an ip", None),
+        ],
+    )
+    def test_lookup(self, database, ip, location):
+        assert database.lookup(ip) == location
+
+    def test_locations_are_deduplicated(self, tmp_path):
+        path = tmp_path / "geoip.bin"
+        ranges = [
+            ("10.0.0.0", "10.0.0.255", "Europe, Belarus, Minsk"),
+            ("10.0.2.0", "10.0.2.255", "Europe, Belarus, Minsk"),
+        ]
+        build_database(ranges, path)
+
+        assert path.read_bytes().count(b"Minsk") == 1
+
+    def test_overlapping_ranges_are_rejected(self, tmp_path):
+        ranges = [
+            ("10.0.0.0", "10.0.0.255", "A"),
+            ("10.0.0.128", "10.0.1.255", "B"),
+        ]
+        with pytest.raises(ValueError):
+            build_database(ranges, tmp_path / "geoip.bin")
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "geoip.bin"
+        path.write_bytes(b"x" * 64)
+
+        with pytest.raises(ValueError):
+            GeoIPDatabase(path)
@@ -0,0 +1,33 @@
+from src.utils import auth
+from src.utils.auth import decode_jwt_many, decode_jwt_many_async, encode_jwt
+
+
+class TestDecodeJWTMany:
+    async def test_batch_is_spread_over_pool_workers(self, monkeypatch):
+        chunks: list[int] = []
+
+        async def run(func, tokens):
+            chunks.append(len(tokens))
+            return func(tokens)
+
+        monkeypatch.setattr(auth.jwt_pool, "_max_workers", 4)
+        monkeypatch.setattr(auth.jwt_pool, "run", run)
+        tokens = [encode_jwt({"sub": str(i)}) for i in range(100)]
+
+        payloads = await decode_jwt_many_async(
+            tokens, inline_max=8, min_chunk_size=16, max_chunk_size=256
+        )
+
+        assert chunks == [25, 25, 25, 25]
+        assert [payload["sub"] for payload in payloads] == [str(i) for i in range(100)]
+
+    async def test_small_batch_is_decoded_inline(self, monkeypatch):
+        async def run(func, tokens):
+            raise AssertionError("Small batch was sent to the pool")
+
+        monkeypatch.setattr(auth.jwt_pool, "run", run)
+        tokens = [encode_jwt({"sub": "1"}), "invalid_token"]
+
+        assert await decode_jwt_many_async(
+            tokens, inline_max=8, min_chunk_size=16, max_chunk_size=256
+        ) == decode_jwt_many(tokens)
@@ -0,0 +1,99 @@
+import json
+from unittest import mock
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from src.utils.auth import encode_jwt, decode_jwt
+from src.utils.jwt_keys import JWTKeyManager
+
+
+def generate_keys(algorithm: str) -> tuple[str, str]:
+    """Return PEM encoded private and public keys for algorithm."""
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+class TestJWTKeyManager:
+    @pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+    def test_encode_decode_with_parsed_keys(self, algorithm):
+        private_key, public_key = generate_keys(algorithm)
+        key_manager = JWTKeyManager(private_key, public_key, algorithm)
+
+        token = encode_jwt(
+            {"sub": "user"}, private_key=key_manager.private_key, algorithm=algorithm
+        )
+        payload = decode_jwt(
+            token, public_key=key_manager.public_key, algorithm=algorithm
+        )
+
+        assert payload["sub"] == "user"
+
+    def test_keys_are_parsed_once(self):
+        key_manager = JWTKeyManager(*generate_keys("ES256"), "ES256")
+
+        assert key_manager.private_key is key_manager.private_key
+        assert key_manager.public_key is key_manager.public_key
+
+    def test_key_type_must_match_algorithm(self):
+        key_manager = JWTKeyManager(*generate_keys("EdDSA"), "RS256")
+
+        with pytest.raises(ValueError):
+            key_manager.load()
+
+    def test_unsupported_algorithm(self):
+        with pytest.raises(ValueError):
+            JWTKeyManager(*generate_keys("RS256"), "HS256")
+
+    def test_token_is_verified_by_key_of_its_kid(self):
+        old_private_key, old_public_key = generate_keys("RS256")
+        old_key_manager = JWTKeyManager(old_private_key, old_public_key, "RS256")
+        key_manager = JWTKeyManager(
+            *generate_keys("ES256"), "ES256", additional_public_keys=[old_public_key]
+        )
+        token = encode_jwt(
+            {"sub": "user"},
+            private_key=old_key_manager.private_key,
+            algorithm="RS256",
+            headers={"kid": old_key_manager.kid},
+        )
+
+        with mock.patch("src.utils.auth.jwt_key_manager", key_manager):
+            assert decode_jwt(token)["sub"] == "user"
+            assert decode_jwt(encode_jwt({"sub": "user"}))["sub"] == "user"
+            with pytest.raises(jwt.InvalidTokenError):
+                decode_jwt(
+                    encode_jwt(
+                        {"sub": "user"},
+                        private_key=key_manager.private_key,
+                        algorithm="ES256",
+                        headers={"kid": "unknown"},
+                    )
+                )
+
+    def test_jwks_contains_all_verification_keys(self):
+        additional_public_key = generate_keys("EdDSA")[1]
+        key_manager = JWTKeyManager(
+            *generate_keys("RS256"), "RS256", [additional_public_key]
+        )
+
+        keys = json.loads(key_manager.jwks)["keys"]
+
+        assert [key["alg"] for key in keys] == ["RS256", "EdDSA"]
+        assert keys[0]["kid"] == key_manager.kid
+        assert all("d" not in key for key in keys)
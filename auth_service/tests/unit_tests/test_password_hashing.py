@@ -0,0 +1,22 @@
+import pytest
+
+from src.exceptions import ServiceBusyException
+from src.utils.auth import hash_password_async, validate_password_async
+from src.utils.process_pool import BoundedProcessPool
+
+
+class TestPasswordHashing:
+    async def test_hash_and_validate_password_async(self):
+        hashed_password = await hash_password_async("password")
+
+        assert hashed_password != "password"
+        assert await validate_password_async("password", hashed_password)
+        assert not await validate_password_async("wrong_password", hashed_password)
+
+    async def test_full_pool_rejects_jobs(self):
+        pool = BoundedProcessPool(max_workers=1, max_pending=0)
+
+        with pytest.raises(ServiceBusyException):
+            await pool.run(pow, 2, 10)
+
+        assert pool.pending == 0
@@ -0,0 +1,32 @@
+from src.core.redis.in_memory import InMemoryRedis
+from src.services.rate_limiter import LocalSlidingWindow, RateLimiter
+
+
+class TestLocalSlidingWindow:
+    def test_requests_over_limit_are_rejected_until_window_slides(self):
+        window = LocalSlidingWindow()
+        limits = [("ip:1", 2, 10)]
+
+        assert window.hit(limits, now=100) == 0
+        assert window.hit(limits, now=105) == 0
+        assert window.hit(limits, now=106) == 4
+        assert window.hit(limits, now=110.5) == 0
+        assert window.hit(limits, now=111) == 4
+
+    def test_rejected_request_is_not_counted_in_other_limits(self):
+        window = LocalSlidingWindow()
+        window.hit([("email:a", 1, 10)], now=100)
+
+        assert window.hit([("ip:1", 1, 10), ("email:a", 1, 10)], now=101) == 9
+        assert window.hit([("ip:1", 1, 10)], now=102) == 0
+
+    def test_zero_limit_rejects_all_requests(self):
+        assert LocalSlidingWindow().hit([("ip:1", 0, 10)], now=100) == 10
+
+
+class TestRateLimiter:
+    async def test_retry_after_is_rounded_up(self):
+        rate_limiter = RateLimiter(InMemoryRedis())
+
+        assert await rate_limiter.hit([("ip:1", 1, 60)]) == 0
+        assert 59 <= await rate_limiter.hit([("ip:1", 1, 60)]) <= 60
@@ -0,0 +1,41 @@
+import uuid
+
+from src.core.database.slow_query import (
+    fingerprint,
+    is_read_only,
+    parameters_shape,
+)
+
+
+class TestFingerprint:
+    def test_lists_of_parameters_and_numbers_are_collapsed(self):
+        assert fingerprint("SELECT * FROM device WHERE id IN ($1, $2) LIMIT 10") == (
+            fingerprint("SELECT *\n FROM device WHERE id IN ($1) LIMIT 5")
+        )
+
+    def test_different_statements(self):
+        assert fingerprint("SELECT id FROM users") != fingerprint(
+            "SELECT email FROM users"
+        )
+
+
+class TestParametersShape:
+    def test_values_are_not_included(self):
+        assert (
+            parameters_shape((uuid.uuid4(), "secret@example.com", [1, 2]), False)
+            == "(UUID, str, list[2])"
+        )
+
+    def test_executemany(self):
+        assert parameters_shape([(1, "a"), (2, "b")], True) == "2 x (int, str)"
+
+
+class TestIsReadOnly:
+    def test_select(self):
+        assert is_read_only("SELECT id FROM device WHERE user_id = $1")
+
+    def test_dml_and_locking_selects(self):
+        assert not is_read_only("UPDATE device SET ip = $1 WHERE id = $2")
+        assert not is_read_only("INSERT INTO outbox_event (event_type) VALUES ($1)")
+        assert not is_read_only("SELECT id FROM outbox_event FOR UPDATE SKIP LOCKED")
+        assert not is_read_only("SELECT id FROM device\nFOR NO KEY UPDATE")
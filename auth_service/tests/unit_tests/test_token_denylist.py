@@ -0,0 +1,107 @@
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+from redis.exceptions import ConnectionError
+
+from src.core.redis.in_memory import InMemoryRedis
+from src.services.token_denylist import TokenDenylist
+from src.utils.bloom import BloomFilter
+
+
+def make_denylist(redis) -> TokenDenylist:
+    return TokenDenylist(
+        redis,
+        channel="denylist",
+        bloom_capacity=1000,
+        bloom_error_rate=0.01,
+        rebuild_interval=60,
+    )
+
+
+def make_payload() -> dict:
+    return {
+        "jti": str(uuid.uuid4()),
+        "sid": str(uuid.uuid4()),
+        "exp": time.time() + 60,
+    }
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [str(uuid.uuid4()) for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10_000))
+        assert false_positives < 300
+
+
+class TestTokenDenylist:
+    async def test_not_revoked_token_is_checked_without_redis(self):
+        redis = AsyncMock()
+        denylist = make_denylist(redis)
+
+        assert not await denylist.is_revoked(make_payload())
+        redis.exists.assert_not_called()
+
+    async def test_revoke_token_and_session(self):
+        redis = InMemoryRedis()
+        denylist = make_denylist(redis)
+        token, other_token = make_payload(), make_payload()
+
+        await denylist.revoke_token(token)
+        await denylist.revoke_sessions([uuid.UUID(other_token["sid"])])
+
+        assert await denylist.is_revoked(token)
+        assert await denylist.is_revoked({"jti": "other", "sid": other_token["sid"]})
+        assert 0 < await redis.ttl(f"denylist:jti:{token['jti']}") <= 61
+
+    async def test_revocation_is_delivered_to_other_workers(self):
+        redis = InMemoryRedis()
+        worker, other_worker = make_denylist(redis), make_denylist(redis)
+        revoked_before_start, revoked_after_start = make_payload(), make_payload()
+        await worker.revoke_token(revoked_before_start)
+
+        await other_worker.start()
+        assert await other_worker.is_revoked(revoked_before_start)
+        await asyncio.sleep(0)
+        await worker.revoke_token(revoked_after_start)
+        await asyncio.sleep(0)
+
+        assert await other_worker.is_revoked(revoked_before_start)
+        assert await other_worker.is_revoked(revoked_after_start)
+        await other_worker.stop()
+
+    async def test_concurrent_rebuilds(self):
+        redis = InMemoryRedis()
+        denylist = make_denylist(redis)
+        tokens = [make_payload() for _ in range(3)]
+        for token in tokens:
+            await denylist.revoke_token(token)
+        scan_iter = redis.scan_iter
+
+        async def slow_scan_iter(*args, **kwargs):
+            async for key in scan_iter(*args, **kwargs):
+                await asyncio.sleep(0)
+                yield key
+
+        redis.scan_iter = slow_scan_iter
+        denylist._bloom = denylist._new_bloom()
+
+        await asyncio.gather(denylist.rebuild(), denylist.rebuild())
+
+        assert all([await denylist.is_revoked(token) for token in tokens])
+
+    async def test_token_is_revoked_if_redis_is_unavailable(self):
+        redis = InMemoryRedis()
+        denylist = make_denylist(redis)
+        token = make_payload()
+        await denylist.revoke_token(token)
+
+        redis.exists = AsyncMock(side_effect=ConnectionError)
+
+        assert await denylist.is_revoked(token)
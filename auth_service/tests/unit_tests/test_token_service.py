@@ -23,7 +23,7 @@ class TestTokenService:
 
         # Assert
         mock_create_jwt.assert_called_once_with(
-            {"sub": f"{user.id}", TokenType.TYPE: TokenType.ACCESS},
+            {"sub": f"{user.id}", "jti": mock.ANY, TokenType.TYPE: TokenType.ACCESS},
             expire_minutes=settings.JWT.ACCESS_TOKEN_LIFE,  # JWT.ACCESS_TOKEN_LIFE
         )
         assert access_token == "mock_access_token"
@@ -35,16 +35,65 @@ class TestTokenService:
         user = User(id=uuid.uuid4())
         token_service = TokenService(db_session=AsyncMock())
 
+        device_id, jti = uuid.uuid4(), uuid.uuid4()
+
         # Act
-        refresh_token, jti = token_service.create_refresh_token(user)
+        refresh_token = token_service.create_refresh_token(user, device_id, jti)
 
         # Assert
         mock_create_jwt.assert_called_once_with(
             {
                 "sub": f"{user.id}",
                 "jti": str(jti),
+                "sid": str(device_id),
                 TokenType.TYPE.value: TokenType.REFRESH.value,
             },
             expire_minutes=settings.JWT.REFRESH_TOKEN_LIFE,
         )
         assert refresh_token == "mock_refresh_token"
+
+    @patch("src.services.token_service.encode_jwt")
+    async def test_create_access_token_with_user_claims(self, mock_create_jwt):
+        # Arrange
+        user = User(
+            id=uuid.uuid4(),
+            email="user@example.com",
+            is_active=True,
+            is_staff=False,
+            is_superuser=False,
+        )
+        token_service = TokenService(db_session=AsyncMock())
+
+        # Act
+        token_service.create_access_token(user, embed_user_claims=True)
+
+        # Assert
+        mock_create_jwt.assert_called_once_with(
+            {
+                "sub": f"{user.id}",
+                "jti": mock.ANY,
+                "email": user.email,
+                "is_active": True,
+                "is_staff": False,
+                "is_superuser": False,
+                TokenType.TYPE.value: TokenType.ACCESS.value,
+            },
+            expire_minutes=settings.JWT.ACCESS_TOKEN_LIFE,
+        )
+
+    def test_get_user_from_claims(self):
+        user_id = uuid.uuid4()
+        payload = {
+            "sub": str(user_id),
+            "email": "user@example.com",
+            "is_active": True,
+            "is_staff": True,
+            "is_superuser": False,
+        }
+
+        user = TokenService.get_user_from_claims(payload)
+
+        assert user.id == user_id
+        assert user.email == "user@example.com"
+        assert user.is_staff
+        assert TokenService.get_user_from_claims({"sub": str(user_id)}) is None
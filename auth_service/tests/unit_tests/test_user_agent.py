@@ -0,0 +1,25 @@
+from starlette.datastructures import Headers
+
+from src.utils.auth import get_user_agent, parse_user_agent
+
+CHROME = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
+)
+
+
+class TestUserAgent:
+    def test_parsed_user_agent_is_cached(self):
+        parse_user_agent.cache_clear()
+
+        first = get_user_agent(Headers({"User-Agent": CHROME}))
+        second = get_user_agent(Headers({"User-Agent": CHROME}))
+
+        assert first == second == "PC / Windows 10 / Chrome 128.0.0"
+        info = parse_user_agent.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_device_info_header_is_used_first(self):
+        headers = Headers({"User-Agent": CHROME, "X-Device-Info": "Android app"})
+
+        assert get_user_agent(headers) == "Android app"
@@ -0,0 +1,57 @@
+import uuid
+from unittest.mock import AsyncMock
+
+from redis.exceptions import ConnectionError
+
+from src.core.redis.in_memory import InMemoryRedis
+from src.core.schemas.user_schemas import UserDTO
+from src.services.user_cache import UserCache
+
+
+def make_user(**kwargs) -> UserDTO:
+    fields = dict(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        is_active=True,
+        is_staff=False,
+        is_superuser=True,
+    )
+    fields.update(kwargs)
+    return UserDTO(**fields)
+
+
+class TestUserCache:
+    def test_serialization_roundtrip(self):
+        user = make_user()
+
+        assert UserCache.loads(UserCache.dumps(user)) == user
+
+    async def test_user_is_read_from_redis_when_not_in_local_cache(self):
+        redis = InMemoryRedis()
+        user = make_user()
+        await UserCache(redis, ttl=60, local_ttl=5, local_maxsize=10).set(user)
+
+        other_worker_cache = UserCache(redis, ttl=60, local_ttl=5, local_maxsize=10)
+
+        assert await other_worker_cache.get(user.id) == user
+        assert await redis.ttl(f"user:{user.id}") == 60
+
+    async def test_invalidate(self):
+        cache = UserCache(InMemoryRedis(), ttl=60, local_ttl=5, local_maxsize=10)
+        user = make_user()
+        await cache.set(user)
+
+        await cache.invalidate(user.id)
+
+        assert await cache.get(user.id) is None
+
+    async def test_redis_errors_are_cache_misses(self):
+        redis = AsyncMock()
+        redis.get.side_effect = ConnectionError
+        redis.set.side_effect = ConnectionError
+        cache = UserCache(redis, ttl=60, local_ttl=0, local_maxsize=10)
+        user = make_user()
+
+        await cache.set(user)
+
+        assert await cache.get(user.id) is None